@@ -0,0 +1,106 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+"""
+Этот скрипт выполняет пакетную обработку записанных видео без веб-интерфейса.
+
+Как это работает:
+1. Для каждого видео из указанной папки загружаются настройки камеры
+   (users/coordinates/<имя файла>.json)
+2. Видео обрабатываются тем же конвейером, что и в приложении (детекция, трекинг,
+   распознавание номеров), но без отрисовки кадров
+3. События распознавания записываются в базу событий, изображения и журналы - на диск
+4. Для каждого файла и в целом выводится количество кадров и скорость обработки
+
+Пример запуска:
+    python batch_process.py путь/к/папке/с/видео --workers 4
+"""
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv')
+
+
+# Инициализация рабочего процесса: ядра делятся между процессами до загрузки моделей
+def init_worker(workers):
+    from files.modelRegistry import limit_threads
+    limit_threads(workers)
+
+
+# Обработка одного видеофайла в рабочем процессе
+def process_file(path, user):
+    import files.videoProcessing as vp
+
+    name = os.path.splitext(os.path.basename(path))[0]
+    camera = vp.load_camera_config(name)
+
+    frames = 0
+    decisions = 0
+    started = time.perf_counter()
+    for _, events in vp.iter_stream(path, camera, user, draw=False):
+        frames += 1
+        decisions += len(events)
+    elapsed = time.perf_counter() - started
+
+    # Дописываем на диск все накопленные изображения, журналы и события
+    vp.get_writer().flush()
+    vp.get_event_store().flush()
+    return path, frames, decisions, elapsed
+
+
+def find_videos(directory):
+    return sorted(os.path.join(directory, file) for file in os.listdir(directory)
+                  if file.lower().endswith(VIDEO_EXTENSIONS))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пакетная обработка видео без веб-интерфейса")
+    parser.add_argument("directory", help="Папка с видеофайлами")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1),
+                        help="Количество рабочих процессов (ядра делятся между ними поровну)")
+    parser.add_argument("--user", default="batch", help="Имя пользователя для сохраняемых изображений и событий")
+    args = parser.parse_args()
+
+    videos = find_videos(args.directory)
+    if not videos:
+        print(f"В папке {args.directory} нет видеофайлов")
+        return 1
+
+    # Пропускаем видео без настроенной зоны интереса
+    tasks = []
+    for path in videos:
+        name = os.path.splitext(os.path.basename(path))[0]
+        if os.path.exists(f'users/coordinates/{name}.json'):
+            tasks.append(path)
+        else:
+            print(f"Зона интереса неопределена для: {name}, файл пропущен")
+
+    total_frames = 0
+    total_decisions = 0
+    failed = 0
+    started = time.perf_counter()
+    workers = max(1, min(args.workers, len(tasks) or 1))
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(workers,)) as executor:
+        futures = {executor.submit(process_file, path, args.user): path for path in tasks}
+        for future in as_completed(futures):
+            try:
+                path, frames, decisions, elapsed = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"{futures[future]}: ошибка обработки: {e}")
+                continue
+            total_frames += frames
+            total_decisions += decisions
+            fps = frames / elapsed if elapsed > 0 else 0.0
+            print(f"{path}: кадров {frames}, решений {decisions}, {elapsed:.1f} с, {fps:.1f} кадр/с")
+    elapsed = time.perf_counter() - started
+
+    fps = total_frames / elapsed if elapsed > 0 else 0.0
+    print(f"Итого: файлов {len(tasks) - failed}, кадров {total_frames}, решений {total_decisions}, "
+          f"{elapsed:.1f} с, {fps:.1f} кадр/с")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+
+"""
+Бенчмарк конвейера распознавания (videoProcessing.py)
+
+Как это работает:
+1. Видео из указанного списка воспроизводятся в 1, 2, 4 и 6 параллельных потоках
+2. Для каждого кадра отдельно замеряется время этапов:
+   decode, model_car, zone_intersest_plot, image_processing, number_processing,
+   read_number (в режиме одного прохода вместо двух предыдущих), plate_quality (оценка качества
+   изображения автомобиля), comparison_number, save_cropped_image
+   Этапы распознавания номера выполняются для каждого автомобиля в зоне интереса на каждом кадре
+   (без трекинга), чтобы измерялась стоимость самих этапов
+3. Для каждого этапа считаются p50/p95/p99 задержки и пропускная способность
+4. Результаты сохраняются в JSON и сравниваются с сохраненным базовым результатом
+   Если p95 этапа или пропускная способность ухудшились больше допуска, скрипт завершается с кодом 1
+
+Пример запуска:
+    python benchmark/bench_pipeline.py видео1.mp4 видео2.mp4 --frames 300
+    python benchmark/bench_pipeline.py видео1.mp4 --save-baseline
+"""
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STAGES = ["decode", "model_car", "zone_intersest_plot", "image_processing",
+          "number_processing", "read_number", "plate_quality", "comparison_number", "save_cropped_image"]
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+# Перцентиль по методу ближайшего ранга
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class StageTimer:
+    """
+    Сбор времени выполнения этапов из нескольких потоков.
+    """
+    def __init__(self):
+        self.samples = {stage: [] for stage in STAGES}
+        self.lock = threading.Lock()
+
+    def run(self, stage, function, *args):
+        started = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            self.samples[stage].append(elapsed)
+        return result
+
+
+# Воспроизведение одного видео с замером этапов
+def replay_stream(vp, filename, camera, frames, warmup, timer, counter, settings):
+    cv2 = vp.cv2
+    cap = cv2.VideoCapture(filename)
+    if not cap.isOpened():
+        raise IOError(f"Не удалось открыть видео: {filename}")
+    zone = camera["zone"]
+    processed = 0
+    try:
+        while processed < warmup + frames:
+            # Первые кадры прогревают модели и в статистику не попадают
+            active = timer if processed >= warmup else StageTimer()
+            ret, frame = active.run("decode", cap.read)
+            if not ret:
+                # Видео короче нужного количества кадров: воспроизводим сначала
+                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ret, frame = active.run("decode", cap.read)
+                if not ret:
+                    break
+            processed += 1
+
+            rect = None
+            if settings["roi_inference"]:
+                rect = vp.roi_rect(zone, frame.shape, settings["roi_pad"], settings["roi_pad_top"])
+            detections = active.run("model_car", vp.detect_cars, frame, rect)
+            active.run("zone_intersest_plot", vp.zone_intersest_plot, frame, detections, zone,
+                       vp.COLORS['white'])
+
+            zone_boxes, _, zone_conf = vp.select_zone_cars(detections, zone, frame.shape)
+            for (x1, y1, x2, y2), car_confidence in zip(zone_boxes, zone_conf):
+                cropped_image = frame[y1:y2, x1:x2].copy()
+                if settings["quality_gate"]:
+                    active.run("plate_quality", vp.quality_score, cropped_image, car_confidence,
+                               settings["quality_sharpness_ref"], settings["quality_size_ref"])
+                if settings["single_pass"]:
+                    auto_number, _ = active.run("read_number", vp.read_number, cropped_image,
+                                                settings["single_pass_min_plate_height"])
+                else:
+                    plate = active.run("image_processing", vp.image_processing, cropped_image)
+                    auto_number, _ = active.run("number_processing", vp.number_processing, plate)
+                active.run("comparison_number", vp.comparison_number, auto_number, settings["fuzzy_max_distance"])
+                active.run("save_cropped_image", vp.save_cropped_image, cropped_image, auto_number, "benchmark")
+
+            if active is timer:
+                with counter["lock"]:
+                    counter["frames"] += 1
+    finally:
+        cap.release()
+
+
+def run_level(vp, videos, cameras, streams, frames, warmup, settings):
+    timer = StageTimer()
+    counter = {"frames": 0, "lock": threading.Lock()}
+    errors = []
+
+    def target(index):
+        filename = videos[index % len(videos)]
+        try:
+            replay_stream(vp, filename, cameras[filename], frames, warmup, timer, counter, settings)
+        except Exception as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(streams)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    if errors:
+        raise RuntimeError("; ".join(errors))
+
+    stages = {}
+    for stage, samples in timer.samples.items():
+        total = sum(samples)
+        stages[stage] = {
+            "count": len(samples),
+            "p50_ms": 1000 * percentile(samples, 50),
+            "p95_ms": 1000 * percentile(samples, 95),
+            "p99_ms": 1000 * percentile(samples, 99),
+            "throughput_per_s": len(samples) / total if total > 0 else 0.0,
+        }
+    return {
+        "streams": streams,
+        "frames": counter["frames"],
+        "elapsed_s": elapsed,
+        "throughput_fps": counter["frames"] / elapsed if elapsed > 0 else 0.0,
+        "stages": stages,
+    }
+
+
+# Сравнение с базовым результатом: список найденных ухудшений
+def compare(results, baseline, tolerance):
+    regressions = []
+    base_levels = {level["streams"]: level for level in baseline.get("levels", [])}
+    for level in results["levels"]:
+        base = base_levels.get(level["streams"])
+        if base is None:
+            continue
+        if level["throughput_fps"] < base["throughput_fps"] * (1 - tolerance):
+            regressions.append(f"{level['streams']} потоков: пропускная способность "
+                               f"{level['throughput_fps']:.2f} < {base['throughput_fps']:.2f} кадр/с")
+        for stage, stats in level["stages"].items():
+            base_stage = base["stages"].get(stage)
+            if not base_stage or not stats["count"] or not base_stage["count"]:
+                continue
+            if stats["p95_ms"] > base_stage["p95_ms"] * (1 + tolerance):
+                regressions.append(f"{level['streams']} потоков, {stage}: p95 "
+                                   f"{stats['p95_ms']:.2f} > {base_stage['p95_ms']:.2f} мс")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк этапов конвейера распознавания")
+    parser.add_argument("videos", nargs="+", help="Видеофайлы для воспроизведения")
+    parser.add_argument("--streams", type=int, nargs="+", default=[1, 2, 4, 6],
+                        help="Количество параллельных потоков")
+    parser.add_argument("--frames", type=int, default=300, help="Количество кадров на поток")
+    parser.add_argument("--warmup", type=int, default=10, help="Количество кадров прогрева")
+    parser.add_argument("--output", default="bench_results.json", help="Файл для сохранения результатов")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Файл базового результата")
+    parser.add_argument("--save-baseline", action="store_true", help="Сохранить результат как базовый")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Допустимое ухудшение (доля)")
+    args = parser.parse_args()
+
+    import files.videoProcessing as vp
+    import files.settings as stg
+
+    # Модели загружаются до замеров, чтобы загрузка не попала в первый уровень
+    vp.get_model("car")
+    vp.get_model("plate")
+
+    # Изображения автомобилей и журналы номеров записываются во временную папку,
+    # чтобы бенчмарк не засорял архив распознаваний в users/
+    output_dir = tempfile.TemporaryDirectory(prefix="bench_pipeline_")
+    vp.DETECTED_CARS_DIR = os.path.join(output_dir.name, "detected_cars")
+    vp.DETECTED_NUMBERS_DIR = os.path.join(output_dir.name, "detected_numbers")
+
+    settings = stg.load_settings()
+    cameras = {}
+    for filename in args.videos:
+        name = os.path.splitext(os.path.basename(filename))[0]
+        try:
+            cameras[filename] = vp.load_camera_config(name, settings, save_migrated=False)
+        except (OSError, ValueError):
+            raise SystemExit(f"Зона интереса неопределена для: {name}")
+
+    results = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "videos": [os.path.basename(filename) for filename in args.videos],
+        "frames_per_stream": args.frames,
+        "settings": settings,
+        "levels": [],
+    }
+    for streams in args.streams:
+        level = run_level(vp, args.videos, cameras, streams, args.frames, args.warmup, settings)
+        results["levels"].append(level)
+        print(f"Потоков: {streams}, {level['throughput_fps']:.2f} кадр/с")
+        for stage in STAGES:
+            stats = level["stages"][stage]
+            print(f"  {stage:<20} n={stats['count']:<6} p50={stats['p50_ms']:8.2f} мс  "
+                  f"p95={stats['p95_ms']:8.2f} мс  p99={stats['p99_ms']:8.2f} мс  "
+                  f"{stats['throughput_per_s']:8.1f} /с")
+
+    vp.get_writer().flush()
+    output_dir.cleanup()
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=4)
+    print(f"Результаты сохранены в {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=4)
+        print(f"Базовый результат сохранен в {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("Базовый результат не найден, сравнение пропущено")
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("Обнаружено ухудшение производительности:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+    print("Ухудшений относительно базового результата нет")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
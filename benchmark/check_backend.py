@@ -0,0 +1,117 @@
+import argparse
+import os
+import sys
+
+"""
+Проверка точности способа выполнения модели (inferenceBackends.py)
+
+Как это работает:
+1. Модель экспортируется в выбранный формат (ONNX или OpenVINO, при необходимости INT8)
+2. На наборе изображений (папка с изображениями или кадры видео) результаты
+   сравниваются с исходной моделью PyTorch: рамки, классы и уверенность
+3. Если доля найденных рамок (recall) или доля совпавших рамок (precision) ниже порога,
+   скрипт завершается с кодом 1
+4. С флагом --save способ выполнения записывается в настройки, если проверка пройдена
+
+Для модели номеров (plate) удобно использовать сохраненные изображения автомобилей
+из users/detected_cars, для модели автомобилей (car) - записи с камер.
+
+Пример запуска:
+    python benchmark/check_backend.py car видео.mp4 --backend openvino --int8 --save
+    python benchmark/check_backend.py plate users/detected_cars --backend onnx
+"""
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+# Загрузка набора изображений: все изображения папки (рекурсивно) или каждый step-й кадр видео
+def load_samples(path, limit, step):
+    import cv2
+
+    images = []
+    if os.path.isdir(path):
+        for root, _, files in os.walk(path):
+            for file in sorted(files):
+                if len(images) >= limit:
+                    return images
+                if file.lower().endswith(IMAGE_EXTENSIONS):
+                    image = cv2.imread(os.path.join(root, file))
+                    if image is not None:
+                        images.append(image)
+        return images
+
+    cap = cv2.VideoCapture(path)
+    index = 0
+    try:
+        while len(images) < limit:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if index % step == 0:
+                images.append(frame)
+            index += 1
+    finally:
+        cap.release()
+    return images
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Проверка точности способа выполнения модели")
+    parser.add_argument("model", choices=["car", "plate"], help="Модель: car - автомобили, plate - номера")
+    parser.add_argument("samples", help="Папка с изображениями или видеофайл")
+    parser.add_argument("--backend", choices=["onnx", "openvino"], required=True, help="Способ выполнения")
+    parser.add_argument("--int8", action="store_true", help="INT8-квантизация")
+    parser.add_argument("--data", default=None, help="Набор данных для калибровки INT8 в OpenVINO (yaml)")
+    parser.add_argument("--imgsz", type=int, default=640, help="Размер входа экспортированной модели")
+    parser.add_argument("--limit", type=int, default=200, help="Максимальное количество изображений")
+    parser.add_argument("--step", type=int, default=10, help="Шаг выборки кадров видео")
+    parser.add_argument("--iou", type=float, default=0.5, help="Порог IoU для совпадения рамок")
+    parser.add_argument("--min-recall", type=float, default=0.98, help="Минимальная доля найденных рамок")
+    parser.add_argument("--min-precision", type=float, default=0.98, help="Минимальная доля совпавших рамок")
+    parser.add_argument("--save", action="store_true", help="Записать способ выполнения в настройки")
+    args = parser.parse_args()
+
+    import files.inferenceBackends as ib
+    import files.settings as stg
+    from files.modelRegistry import MODEL_PATHS
+
+    images = load_samples(args.samples, args.limit, args.step)
+    if not images:
+        print(f"Не найдено изображений: {args.samples}")
+        return 1
+
+    weights = MODEL_PATHS[args.model]
+    reference = ib.load_model(weights)
+    candidate = ib.load_model(weights, args.backend, args.int8, args.imgsz, args.data)
+
+    # Прогрев обеих моделей, чтобы первая загрузка не попала в замер времени
+    reference(images[0], verbose=False)
+    candidate(images[0], verbose=False)
+
+    report = ib.check_accuracy(reference, candidate, images, iou_threshold=args.iou)
+    name = f"{args.backend}{' int8' if args.int8 else ''}"
+    print(f"Модель {args.model}, {name}, изображений: {report['images']}")
+    print(f"  Рамок PyTorch: {report['reference_boxes']}, рамок {name}: {report['candidate_boxes']}, "
+          f"совпало: {report['matched']}")
+    print(f"  Recall: {report['recall']:.3f}, precision: {report['precision']:.3f}, "
+          f"средний IoU: {report['mean_iou']:.3f}, расхождение уверенности: {report['max_conf_diff']:.3f}")
+    print(f"  Время на изображение: PyTorch {report['reference_ms']:.1f} мс, {name} {report['candidate_ms']:.1f} мс")
+
+    if report["recall"] < args.min_recall or report["precision"] < args.min_precision:
+        print("Проверка не пройдена: точность ниже порога")
+        return 1
+    print("Проверка пройдена")
+
+    if args.save:
+        settings = stg.load_settings()
+        backends = settings.setdefault("backends", {})
+        backends[args.model] = {"backend": args.backend, "int8": args.int8, "imgsz": args.imgsz, "data": args.data}
+        stg.save_settings(settings)
+        print(f"Способ выполнения сохранен в {stg.SETTINGS_FILE}, изменения вступят в силу после перезапуска приложения")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
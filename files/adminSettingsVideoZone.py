@@ -1,14 +1,17 @@
 import streamlit as st
 import os
 import cv2
-import tempfile
 import json
 import shutil
+import numpy as np
+from files.zones import Zone, load_zone_config, save_zone_config
+from files.uploadCache import get_upload_cache
+from files.videoPreview import get_preview
 
 def video_zone():
     """
-    Функция для загрузки и первичной обработки видеофайла.
-    Позволяет пользователю загрузить видео и подготовить его для дальнейшего анализа.
+    Функция для загрузки видеофайла и выбора кадра для настройки зоны интереса.
+    Видео сохраняется в кэш загрузок один раз, кадры для выбора берутся из кэша кадров.
     """
     st.sidebar.header(":violet[Выберете файл для обработки]", divider='rainbow')
     
@@ -19,39 +22,35 @@ def video_zone():
     os.makedirs('users/temp', exist_ok=True)
   
     if uploaded_file is not None:
-        # Сохранение информации о файле для дальнейшего использования
-        with open('users/temp/name.json', 'w', encoding='utf-8') as f:
-            json.dump({"filename": os.path.splitext(uploaded_file.name)[0]}, f)
+        # Видео сохраняется на диск один раз и повторно не записывается при перезапуске скрипта
+        path = get_upload_cache().spool([uploaded_file])[0]
+        preview = get_preview(path)
         
-        # Создание временного файла для безопасной обработки видео
-        temp_video = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
-        temp_video.write(uploaded_file.read())
-        temp_video.close()
-
-        # Извлечение первого кадра для анализа зоны интереса
-        cap = cv2.VideoCapture(temp_video.name)
-        ret, frame = cap.read()
+        # Выбор момента видео: пустой первый кадр можно заменить более показательным
+        seconds = 0.0
+        if preview.duration > preview.step_seconds:
+            seconds = st.sidebar.slider("Кадр для настройки зоны интереса, с", 0.0, float(preview.duration),
+                                        0.0, step=float(preview.step_seconds), format="%.1f")
+        thumbnail = preview.thumbnail(preview.frame_number(seconds))
         
-        if ret:
-            # Сохранение первого кадра для дальнейшей обработки
-            temp_frame = tempfile.NamedTemporaryFile(delete=False, suffix='.jpg')
-            os.makedirs('users/temp', exist_ok=True)
-            cv2.imwrite('users/temp/temp_img.jpg', frame)
-      
-            # Освобождение ресурсов и очистка временных файлов
-            cap.release()
-            os.unlink(temp_video.name)
-            try:
-                os.unlink(temp_frame.name)
-            except:
-                pass
+        if thumbnail is not None:
+            # Сохранение выбранного кадра и информации о файле для настройки зоны интереса
+            shutil.copyfile(thumbnail, 'users/temp/temp_img.jpg')
+            with open('users/temp/name.json', 'w', encoding='utf-8') as f:
+                json.dump({"filename": os.path.splitext(uploaded_file.name)[0],
+                           "frame_width": preview.index["width"],
+                           "frame_height": preview.index["height"]}, f)
         else:
             st.error("Не удалось прочитать видео файл")    
     
+# Многоугольник зоны интереса по умолчанию: прямоугольник в середине кадра
+def default_polygon(width, height):
+    return [[width//4, height//4], [width*3//4, height//4], [width*3//4, height//2], [width//4, height//2]]
+
 def area_of_interest():
     """
     Функция для интерактивного определения зоны интереса на видео.
-    Позволяет пользователю визуально настроить область анализа с помощью удобных ползунков.
+    Зона интереса - многоугольник, вершины которого задаются в таблице.
     """
     st.header(":violet[_Выберете область интереса_]", divider='rainbow')
 
@@ -62,22 +61,26 @@ def area_of_interest():
         # Получение размеров изображения
         height, width, _ = image.shape
 
-        # Получение имени файла из временного хранилища
+        # Получение имени файла и размера кадра видео из временного хранилища
+        # Кадр для настройки может быть уменьшен, вершины зоны сохраняются в координатах видео
         with open('users/temp/name.json', 'r', encoding='utf-8') as f:
-            filename = json.load(f)['filename']
-
-        # Попытка загрузить сохраненные настройки
-        default_y1 = height//4
-        default_x1 = width//2
-        default_xz = width//4
-        default_yz = height//2
+            video_info = json.load(f)
+        filename = video_info['filename']
+        frame_width = video_info.get('frame_width') or width
+        frame_height = video_info.get('frame_height') or height
+
+        # Попытка загрузить сохраненные настройки (старые настройки переводятся в многоугольник)
+        polygon = default_polygon(width, height)
+        default_sensitivity = 0.5
+        default_priority = 1
         try:
-            with open(f"users/coordinates/{filename}.json", "r") as f:
-                saved_data = json.load(f)
-                default_x1 = saved_data.get("x", width//4)
-                default_y1 = saved_data.get("y", height//4)
-                default_xz = saved_data.get("xz", width//2)
-                default_yz = saved_data.get("yz", width//2)
+            saved_data = load_zone_config(filename)
+            saved_zone = Zone.from_config(saved_data)
+            if saved_zone.defined:
+                # Вершины переводятся в координаты текущего кадра
+                polygon = saved_zone.compile(image.shape).points.tolist()
+            default_sensitivity = saved_data.get("motion_sensitivity", 0.005) * 100
+            default_priority = saved_data.get("priority", 1)
         except FileNotFoundError:
             pass
         
@@ -85,42 +88,58 @@ def area_of_interest():
         col1, col2 = st.columns(2)
 
         with col2:
-            # Интуитивные ползунки для настройки зоны интереса
-            y1 = st.slider('Верхняя граница зоны интереса (синяя)', 0, height, default_y1)
-            y2 = st.slider('Нижняя граница зоны интереса (бирюзовая)', 0, height, default_yz)
-            x1 = st.slider('Правая граница зоны интереса (красная)', 0, width, default_x1)
-            x2 = st.slider('Левая граница зоны интереса (желтая)', 0, width, default_xz)
+            # Вершины многоугольника зоны интереса: строки можно добавлять и удалять
+            rows = st.data_editor(
+                [{"x": x, "y": y} for x, y in polygon],
+                num_rows="dynamic",
+                use_container_width=True,
+                key=f"zone_polygon_{filename}",
+                column_config={
+                    "x": st.column_config.NumberColumn("x", min_value=0, max_value=width, step=1),
+                    "y": st.column_config.NumberColumn("y", min_value=0, max_value=height, step=1),
+                })
+            points = [[int(row["x"]), int(row["y"])] for row in rows
+                      if row.get("x") is not None and row.get("y") is not None]
+            
+            # Чувствительность фильтра движения: доля изменившихся пикселей зоны в процентах
+            sensitivity = st.slider('Чувствительность детектора движения, % изменившихся пикселей',
+                                    0.0, 5.0, float(default_sensitivity), step=0.1,
+                                    help='Чем меньше значение, тем меньше кадров пропускается без детекции')
             
-            # Визуализация выбранной зоны с помощью цветных линий
+            # Приоритет камеры при распределении процессорного времени между видеопотоками
+            priority = st.number_input('Приоритет камеры', min_value=1, max_value=10, value=int(default_priority),
+                                       help='Камера с приоритетом 2 получает вдвое больше времени обработки, чем камера с приоритетом 1')
+            
+            # Визуализация зоны: полупрозрачная заливка, границы и номера вершин
             img_with_lines = image.copy()
-            cv2.line(img_with_lines, (0, y1), (width, y1), (255, 0, 0), 2)  # Синяя горизонтальная
-            cv2.line(img_with_lines, (0, y2), (width, y2), (255, 255, 0), 2)  # Бирюзовая горизонтальная
-            cv2.line(img_with_lines, (x1, 0), (x1, height), (0, 0, 255), 2)  # Красная вертикальная
-            cv2.line(img_with_lines, (x2, 0), (x2, height), (0, 255, 255), 2)  # Желтая вертикальная
+            if len(points) >= 3:
+                contour = np.array(points, dtype=np.int32)
+                fill = img_with_lines.copy()
+                cv2.fillPoly(fill, [contour], (255, 0, 0))
+                img_with_lines = cv2.addWeighted(fill, 0.25, img_with_lines, 0.75, 0)
+                cv2.polylines(img_with_lines, [contour], True, (255, 0, 0), 2)
+            for number, (x, y) in enumerate(points, start=1):
+                cv2.circle(img_with_lines, (x, y), 6, (0, 255, 255), -1)
+                cv2.putText(img_with_lines, str(number), (x + 8, y - 8), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
 
             # Кнопка для сохранения настроек
             if st.button(":violet[Завершить настройку]", use_container_width=True):
-                # Сохранение координат и параметров зоны интереса
-                intersection = (x1, y1, y2, x2)
+                if len(points) < 3:
+                    st.error(":red[_Зона интереса должна содержать не меньше трех вершин_]")
+                    return
                 
+                # Сохранение многоугольника и параметров зоны интереса
                 intersection_data = {
-                    "frame_width": width,
-                    "frame_height": height,
-                    "x": x1,
-                    "y": y1,
-                    "yz": y2,
-                    "xz": x2,
-                    "intersection": intersection
+                    "frame_width": frame_width,
+                    "frame_height": frame_height,
+                    "polygon": [[round(x * frame_width / width), round(y * frame_height / height)]
+                                for x, y in points],
+                    "motion_sensitivity": sensitivity / 100,
+                    "priority": int(priority)
                 }
                 
-                # Чтение имени файла и сохранение настроек
-                # with open('users/temp/name.json', 'r', encoding='utf-8') as f:
-                #     filename = json.load(f)['filename']
-                
                 # Сохранение конфигурации в постоянное хранилище
-                os.makedirs("users/coordinates", exist_ok=True)    
-                with open(f"users/coordinates/{filename}.json", "w") as f:
-                    json.dump(intersection_data, f)                
+                save_zone_config(filename, intersection_data)
                 
                 # Очистка временных файлов
                 shutil.rmtree('users/temp', ignore_errors=True)
@@ -142,20 +161,20 @@ def area_of_interest():
 
 Описание функционала:
 1. Интерактивный интерфейс
+   - Выбор кадра видео ползунком: кадры берутся из кэша и повторно не декодируются
    - Разделение экрана на две колонки для удобства работы
    - Визуальный предпросмотр настроек в реальном времени
-   - Интуитивно понятные ползунки управления
+   - Редактирование вершин зоны в таблице
 
 2. Настройка зоны интереса
-   - Синяя горизонтальная линия для определения верхней границы
-   - Бирюзовая горизонтальная линия для определения нижней границы
-   - Красная вертикальная линия для определения правой боковой границы
-   - Желтая вертикальная линия для определения левой боковой границы
-   - Зона интереса определяется пересечением этих линий, при этом верхняя и нижняя границы определяют 
-     моменты начала и окончания распознавания, а правая и левая границы отсекают нежелательные области.
+   - Зона интереса - многоугольник произвольной формы
+   - Вершины многоугольника задаются в таблице, строки можно добавлять и удалять
+   - Предпросмотр зоны с заливкой и номерами вершин
+   - Автомобиль находится в зоне интереса, если оба нижних угла его рамки лежат внутри многоугольника
 
 3. Сохранение настроек
    - Автоматическое сохранение параметров в JSON-формате
+   - Старые настройки из четырех линий автоматически переводятся в многоугольник
    - Создание отдельной папки для хранения конфигураций
    - Очистка временных файлов после сохранения
 
@@ -168,6 +187,7 @@ def area_of_interest():
    - Поддержка различных разрешений видео
    - Точная настройка координат зоны интереса
    - Мгновенное применение изменений
+   - Настройка чувствительности фильтра движения для каждой камеры
 
 Преимущества:
 - Простой и понятный интерфейс
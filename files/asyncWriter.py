@@ -0,0 +1,131 @@
+import atexit
+import os
+import queue
+import threading
+
+import cv2
+
+import files.settings as stg
+
+
+class AsyncWriter:
+    """
+    Фоновая запись вырезанных кадров и журналов распознавания.
+    Задачи попадают в ограниченную очередь, фоновый поток кодирует JPEG
+    и дописывает строки журналов пакетами (один open на файл за пакет).
+
+    Политика при переполнении очереди (диск не успевает):
+    - "block" - поток обработки ждет освобождения места в очереди;
+    - "drop"  - новые изображения отбрасываются, строки журналов записываются всегда.
+    """
+    def __init__(self, max_queue=256, policy="drop", batch_size=64):
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.policy = policy
+        self.batch_size = batch_size
+        self.dropped = 0
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def _ensure_started(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+
+    def _put(self, item, droppable):
+        self._ensure_started()
+        if self.policy == "block" or not droppable:
+            self.queue.put(item)
+            return
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def write_image(self, path, image):
+        self._put(("image", path, image), droppable=True)
+
+    def append_text(self, path, line):
+        self._put(("text", path, line), droppable=False)
+
+    def _run(self):
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            # Забираем все, что накопилось в очереди, чтобы записать одним пакетом
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            texts = {}
+            for item in batch:
+                if item is None:
+                    running = False
+                    continue
+                kind, path, payload = item
+                try:
+                    if kind == "image":
+                        os.makedirs(os.path.dirname(path), exist_ok=True)
+                        cv2.imwrite(path, payload)
+                    else:
+                        texts.setdefault(path, []).append(payload)
+                except Exception:
+                    pass
+
+            for path, lines in texts.items():
+                try:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    with open(path, "a") as f:
+                        f.write("".join(lines))
+                except Exception:
+                    pass
+
+            for _ in batch:
+                self.queue.task_done()
+
+    def flush(self):
+        # Ожидание записи всех поставленных в очередь задач
+        if self.thread is not None and self.thread.is_alive():
+            self.queue.join()
+
+    def stop(self):
+        if self.thread is not None and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        self.thread = None
+
+    def qsize(self):
+        return self.queue.qsize()
+
+
+# Общий объект записи для всех потоков процесса
+_writer = None
+_writer_lock = threading.Lock()
+
+def get_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            settings = stg.load_settings()
+            _writer = AsyncWriter(settings["writer_queue_size"], settings["writer_policy"])
+            # При завершении процесса дописываем все оставшиеся данные
+            atexit.register(_writer.stop)
+        return _writer
+
+
+"""
+Модуль фоновой записи (asyncWriter.py)
+
+1. Очередь записи
+   - Ограниченная очередь задач на запись изображений и строк журналов
+   - Кодирование JPEG и запись на диск вне цикла обработки кадров
+
+2. Пакетная запись журналов
+   - Строки для одного файла дописываются за одно открытие файла
+
+3. Управление
+   - Явный сброс очереди при остановке обработки
+   - Политика при переполнении: ожидание или отбрасывание изображений
+"""
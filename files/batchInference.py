@@ -0,0 +1,146 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class BatchInferenceService:
+    """
+    Общий сервис пакетного инференса для нескольких видеопотоков.
+    Потоки отправляют кадры в общую очередь, сервис собирает их в пакет
+    (не больше max_batch кадров и не дольше max_wait секунд ожидания)
+    и прогоняет через модель одним вызовом.
+    Поток ждет результат не дольше timeout секунд, чтобы остановившийся сервис не блокировал обработку.
+    """
+    def __init__(self, model, max_batch=6, max_wait=0.02, timeout=30.0):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.timeout = timeout
+        self.requests = queue.Queue()
+        self.lock = threading.Lock()
+        # Флаг running и постановка кадра в очередь защищены одной блокировкой:
+        # после остановки сервиса новые кадры в очередь не попадают
+        self.state_lock = threading.Lock()
+        self.running = False
+        self.thread = None
+
+        # Статистика работы сервиса
+        self.batches = 0
+        self.frames = 0
+        self.max_batch_size = 0
+        self.total_wait = 0.0
+        self.max_wait_time = 0.0
+
+    def start(self):
+        with self.state_lock:
+            if self.running:
+                return self
+            self.running = True
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        with self.state_lock:
+            self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        # Кадры, оставшиеся в очереди после остановки, завершаются ошибкой, чтобы потоки не ждали вечно
+        while True:
+            try:
+                _, _, future = self.requests.get_nowait()
+            except queue.Empty:
+                break
+            future.set_exception(RuntimeError("Сервис пакетного инференса остановлен"))
+
+    def infer(self, frame):
+        """
+        Отправляет кадр в очередь и ждет результат.
+        Возвращает список результатов, как при вызове model(frame).
+        """
+        future = Future()
+        with self.state_lock:
+            running = self.running
+            if running:
+                self.requests.put((frame, time.perf_counter(), future))
+        if not running:
+            return self.model(frame)
+        return [future.result(timeout=self.timeout)]
+
+    def _collect(self):
+        # Ждем первый кадр, затем добираем пакет до истечения бюджета задержки
+        try:
+            first = self.requests.get(timeout=0.1)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while self.running or not self.requests.empty():
+            batch = self._collect()
+            if not batch:
+                continue
+
+            started = time.perf_counter()
+            frames = [frame for frame, _, _ in batch]
+            try:
+                results = self.model(frames)
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            # Обновляем статистику: размер пакета и время ожидания в очереди
+            with self.lock:
+                self.batches += 1
+                self.frames += len(batch)
+                self.max_batch_size = max(self.max_batch_size, len(batch))
+                for _, queued, _ in batch:
+                    wait = started - queued
+                    self.total_wait += wait
+                    self.max_wait_time = max(self.max_wait_time, wait)
+
+            # Возвращаем результаты потокам
+            for (_, _, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "batches": self.batches,
+                "frames": self.frames,
+                "avg_batch_size": self.frames / self.batches if self.batches else 0.0,
+                "max_batch_size": self.max_batch_size,
+                "avg_queue_wait_ms": 1000 * self.total_wait / self.frames if self.frames else 0.0,
+                "max_queue_wait_ms": 1000 * self.max_wait_time,
+            }
+
+
+"""
+Модуль пакетного инференса (batchInference.py)
+
+1. Общая очередь кадров
+   - Кадры от всех видеопотоков попадают в одну очередь
+   - Каждый поток получает свой результат через Future
+   - Ожидание результата ограничено по времени, кадры после остановки сервиса завершаются ошибкой
+
+2. Сбор пакета
+   - Пакет ограничен размером max_batch
+   - Ожидание добора пакета ограничено бюджетом задержки max_wait
+
+3. Статистика
+   - Средний и максимальный размер пакета
+   - Среднее и максимальное время ожидания кадра в очереди
+"""
@@ -0,0 +1,66 @@
+import numpy as np
+
+
+class Detections:
+    """
+    Результаты детекции в виде массивов NumPy в координатах исходного кадра.
+    Рамки, классы и уверенности переносятся с устройства модели один раз на кадр.
+    """
+    def __init__(self, xyxy, cls, conf, names=None):
+        self.xyxy = xyxy    # (N, 4) float32: x1, y1, x2, y2
+        self.cls = cls      # (N,) int32
+        self.conf = conf    # (N,) float32
+        self.names = names or {}
+
+    @classmethod
+    def from_result(cls, result, offset=(0, 0)):
+        """
+        Преобразует результат ultralytics в Detections.
+        offset - смещение (x, y) области, на которой запускался детектор, относительно кадра.
+        """
+        boxes = result.boxes
+        xyxy = boxes.xyxy.cpu().numpy().astype(np.float32)
+        if offset != (0, 0):
+            xyxy += np.array([offset[0], offset[1], offset[0], offset[1]], dtype=np.float32)
+        return cls(xyxy,
+                   boxes.cls.cpu().numpy().astype(np.int32),
+                   boxes.conf.cpu().numpy().astype(np.float32),
+                   result.names)
+
+    # Отбор детекций по маске или индексам
+    def select(self, index):
+        return Detections(self.xyxy[index], self.cls[index], self.conf[index], self.names)
+
+    def __len__(self):
+        return len(self.cls)
+
+
+# Прямоугольник для детекции по зоне интереса (Zone) с запасом
+# Сверху запас больше: в зоне проверяется нижний край рамки, а сам автомобиль находится выше
+def roi_rect(zone, frame_shape, pad=0.02, pad_top=0.3):
+    height, width = frame_shape[:2]
+    if zone is None or not zone.defined:
+        return None
+    zx1, zy1, zx2, zy2 = zone.bounds(frame_shape)
+    pad_x = int(pad * width)
+    pad_y = int(pad * height)
+    x1 = max(0, zx1 - pad_x)
+    x2 = min(width, zx2 + pad_x)
+    y1 = max(0, zy1 - int(pad_top * height))
+    y2 = min(height, zy2 + pad_y)
+    if x2 <= x1 or y2 <= y1:
+        return None
+    return x1, y1, x2, y2
+
+
+"""
+Модуль результатов детекции (detections.py)
+
+1. Детекции
+   - Рамки, классы и уверенности в виде массивов NumPy
+   - Перевод координат из области детекции в координаты кадра
+
+2. Детекция по зоне интереса
+   - Расчет прямоугольника, описанного вокруг зоны интереса, с запасом по краям
+   - Увеличенный запас сверху для автомобилей, нижний край которых находится в зоне
+"""
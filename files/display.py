@@ -0,0 +1,160 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+import streamlit as st
+
+
+class ZoneOverlay:
+    """
+    Статичный слой границ зоны интереса (Zone).
+    Линии рисуются один раз для размера кадра, затем на каждом кадре
+    копируются только пиксели линий.
+    """
+    def __init__(self, zone, thickness=2, color=(255, 0, 0)):
+        self.zone = zone
+        self.thickness = thickness
+        self.color = color
+        self.shape = None
+        self.index = None
+        self.pixels = None
+
+    def _build(self, shape):
+        height, width = shape[:2]
+        layer = np.zeros(shape, dtype=np.uint8)
+        mask = np.zeros((height, width), dtype=np.uint8)
+        if self.zone is not None and self.zone.defined:
+            points = [self.zone.compile(shape).points]
+            cv2.polylines(layer, points, True, self.color, self.thickness)
+            cv2.polylines(mask, points, True, 255, self.thickness)
+        self.shape = shape
+        self.index = np.nonzero(mask)
+        self.pixels = layer[self.index]
+
+    def apply(self, frame):
+        # Рисует зону интереса на кадре (на месте)
+        if self.shape != frame.shape:
+            self._build(frame.shape)
+        frame[self.index] = self.pixels
+        return frame
+
+
+class DisplayBuffer:
+    """
+    Последний кадр каждого видеопотока для вывода в интерфейс.
+    Потоки обработки только заменяют кадр и не ждут интерфейс.
+    Интерфейс забирает кадры не чаще max_fps раз в секунду,
+    уменьшает их до max_width и передает в браузер в формате JPEG.
+    Кадры, которые не успели показать, заменяются более новыми.
+    """
+    def __init__(self, streams, max_fps=10, max_width=640, jpeg_quality=80):
+        self.interval = 1.0 / max(max_fps, 0.1)
+        self.max_width = max_width
+        self.jpeg_quality = jpeg_quality
+        self.lock = threading.Lock()
+        self.frames = [None] * streams
+        self.captions = [None] * streams
+        self.last_render = 0.0
+        self.shown = 0
+        self.replaced = 0
+
+    def put(self, position, frame, caption=None):
+        # frame - кадр BGR, после передачи он больше не изменяется потоком обработки
+        with self.lock:
+            if self.frames[position] is not None:
+                self.replaced += 1
+            self.frames[position] = frame
+            self.captions[position] = caption
+
+    def encode(self, frame):
+        height, width = frame.shape[:2]
+        if self.max_width and width > self.max_width:
+            frame = cv2.resize(frame, (self.max_width, int(height * self.max_width / width)),
+                               interpolation=cv2.INTER_AREA)
+        ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        return buffer.tobytes() if ok else None
+
+    def render(self, placeholders, force=False):
+        """
+        Выводит новые кадры в плейсхолдеры. Вызывается из потока скрипта Streamlit.
+        placeholders - список плейсхолдеров по номерам видеопотоков
+        или словарь {номер видеопотока: плейсхолдер} для видеопотоков текущей страницы.
+        Возвращает количество выведенных кадров.
+        """
+        now = time.monotonic()
+        if not force and now - self.last_render < self.interval:
+            return 0
+        self.last_render = now
+        if not isinstance(placeholders, dict):
+            placeholders = dict(enumerate(placeholders))
+        with self.lock:
+            items = [(position, frame, self.captions[position])
+                     for position, frame in enumerate(self.frames)
+                     if frame is not None and position in placeholders]
+            for position, _, _ in items:
+                self.frames[position] = None
+        for position, frame, caption in items:
+            image = self.encode(frame)
+            if image is not None:
+                placeholders[position].image(image, caption=caption)
+        self.shown += len(items)
+        return len(items)
+
+
+class VideoGrid:
+    """
+    Сетка видео: columns x rows видеопотоков на странице.
+    Если видеопотоков больше, страницы сменяются каждые page_seconds секунд.
+    """
+    def __init__(self, streams, columns=3, rows=2, page_seconds=10):
+        self.streams = streams
+        self.page_size = max(1, columns * rows)
+        self.pages = max(1, -(-streams // self.page_size))
+        self.page_seconds = page_seconds
+        self.page = 0
+        self.page_started = time.monotonic()
+        self.caption_page = None
+        self.caption = st.empty()
+        cols = st.columns(columns)
+        self.placeholders = [cols[i % columns].empty() for i in range(min(streams, self.page_size))]
+
+    def targets(self):
+        # Видеопотоки текущей страницы и их плейсхолдеры
+        first = self.page * self.page_size
+        return {first + i: placeholder for i, placeholder in enumerate(self.placeholders)
+                if first + i < self.streams}
+
+    def render(self, display, force=False):
+        changed = False
+        if self.pages > 1 and time.monotonic() - self.page_started >= self.page_seconds:
+            self.page = (self.page + 1) % self.pages
+            self.page_started = time.monotonic()
+            changed = True
+            # На неполной последней странице лишние плейсхолдеры очищаются
+            for i in range(len(self.targets()), len(self.placeholders)):
+                self.placeholders[i].empty()
+        if self.pages > 1 and self.caption_page != self.page:
+            self.caption_page = self.page
+            first = self.page * self.page_size + 1
+            last = min(self.streams, first + self.page_size - 1)
+            self.caption.caption(f"Видео {first}-{last} из {self.streams}, страница {self.page + 1} из {self.pages}")
+        return display.render(self.targets(), force=force or changed)
+
+
+"""
+Модуль вывода видео (display.py)
+
+1. Зона интереса
+   - Границы зоны рисуются один раз для размера кадра
+   - На каждом кадре копируются только пиксели линий
+
+2. Вывод кадров
+   - Для каждого видеопотока хранится только последний кадр
+   - Обработка видео не ждет вывода кадров в интерфейс
+   - Частота обновления ограничена max_fps
+   - Кадры уменьшаются и передаются в браузер в формате JPEG
+
+3. Сетка видео
+   - Фиксированное число видео на странице, страницы сменяются автоматически
+"""
@@ -0,0 +1,215 @@
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+# Файл базы данных событий распознавания
+DB_FILE = "users/events.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    camera TEXT,
+    frame INTEGER,
+    plate TEXT,
+    decision TEXT,
+    confidence REAL,
+    distance REAL,
+    crop_path TEXT,
+    user TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events(ts);
+CREATE INDEX IF NOT EXISTS idx_events_plate_ts ON events(plate, ts);
+CREATE INDEX IF NOT EXISTS idx_events_camera_ts ON events(camera, ts);
+"""
+
+COLUMNS = ("ts", "camera", "frame", "plate", "decision", "confidence", "distance", "crop_path", "user")
+
+
+def connect(path=DB_FILE):
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+# Создание базы данных и индексов
+def create_schema(path=DB_FILE):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        # WAL позволяет читать историю во время записи новых событий
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+    finally:
+        conn.close()
+
+
+# Условия выборки событий по фильтрам
+# Поиск номера по префиксу выполняется диапазоном, чтобы использовался индекс
+def _where(plate=None, camera=None, decision=None, start=None, end=None):
+    conditions = []
+    params = []
+    if plate:
+        conditions.append("plate >= ? AND plate < ?")
+        params += [plate, plate + "\uffff"]
+    if camera:
+        conditions.append("camera = ?")
+        params.append(camera)
+    if decision:
+        conditions.append("decision = ?")
+        params.append(decision)
+    if start is not None:
+        conditions.append("ts >= ?")
+        params.append(start)
+    if end is not None:
+        conditions.append("ts < ?")
+        params.append(end)
+    where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    return where, params
+
+
+class EventStore:
+    """
+    Хранилище событий распознавания в SQLite.
+    События записываются фоновым потоком пакетами в одной транзакции,
+    выборки выполняются по индексам номера, камеры и времени.
+    """
+    def __init__(self, path=DB_FILE, batch_size=200, flush_interval=1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+        create_schema(path)
+
+    def add(self, event):
+        """
+        Добавляет событие: словарь с ключами из COLUMNS (ts по умолчанию - текущее время).
+        """
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+        row = dict(event)
+        row.setdefault("ts", time.time())
+        self.queue.put(tuple(row.get(column) for column in COLUMNS))
+
+    def _run(self):
+        conn = connect(self.path)
+        running = True
+        try:
+            while running:
+                batch = [self.queue.get()]
+                # Собираем пакет событий, но не ждем дольше flush_interval
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self.queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+
+                rows = [row for row in batch if row is not None]
+                running = len(rows) == len(batch)
+                try:
+                    with conn:
+                        conn.executemany(
+                            f"INSERT INTO events ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                            rows)
+                except sqlite3.Error:
+                    pass
+                for _ in batch:
+                    self.queue.task_done()
+        finally:
+            conn.close()
+
+    def flush(self):
+        if self.thread is not None and self.thread.is_alive():
+            self.queue.join()
+
+    def stop(self):
+        if self.thread is not None and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        self.thread = None
+
+    def qsize(self):
+        return self.queue.qsize()
+
+    # Выборка событий с фильтрами, от новых к старым
+    def query(self, plate=None, camera=None, decision=None, start=None, end=None, limit=100, offset=0):
+        where, params = _where(plate, camera, decision, start, end)
+        conn = connect(self.path)
+        try:
+            rows = conn.execute(
+                f"SELECT id, {', '.join(COLUMNS)} FROM events{where} ORDER BY ts DESC LIMIT ? OFFSET ?",
+                params + [limit, offset]).fetchall()
+        finally:
+            conn.close()
+        return [dict(row) for row in rows]
+
+    def count(self, plate=None, camera=None, decision=None, start=None, end=None):
+        where, params = _where(plate, camera, decision, start, end)
+        conn = connect(self.path)
+        try:
+            return conn.execute(f"SELECT COUNT(*) FROM events{where}", params).fetchone()[0]
+        finally:
+            conn.close()
+
+    # Последний проезд автомобиля с указанным номером
+    def last_seen(self, plate):
+        conn = connect(self.path)
+        try:
+            row = conn.execute(
+                f"SELECT id, {', '.join(COLUMNS)} FROM events WHERE plate = ? ORDER BY ts DESC LIMIT 1",
+                (plate,)).fetchone()
+        finally:
+            conn.close()
+        return dict(row) if row else None
+
+    def cameras(self):
+        conn = connect(self.path)
+        try:
+            return [row[0] for row in conn.execute("SELECT DISTINCT camera FROM events ORDER BY camera")
+                    if row[0] is not None]
+        finally:
+            conn.close()
+
+
+# Общее хранилище событий для всех потоков процесса
+_store = None
+_store_lock = threading.Lock()
+
+def get_event_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = EventStore()
+            atexit.register(_store.stop)
+        return _store
+
+
+"""
+Модуль хранилища событий (eventStore.py)
+
+1. Структура события
+   - Время, камера, номер кадра, номер автомобиля
+   - Решение (MISS/STOP), уверенность распознавания, расстояние до номера из базы
+   - Путь к сохраненному изображению и пользователь
+
+2. Запись
+   - Фоновая пакетная запись событий в одной транзакции
+   - Режим WAL для одновременного чтения и записи
+
+3. Выборки
+   - Индексы по номеру, камере и времени
+   - Фильтры по номеру (префикс), камере, решению и периоду
+   - Последний проезд автомобиля по номеру
+"""
@@ -0,0 +1,113 @@
+import math
+from itertools import combinations
+
+# Пары символов, которые модель часто путает при распознавании номера
+CONFUSIONS = [
+    ('O', '0'), ('B', '8'), ('0', '8'), ('3', '8'), ('6', '8'), ('5', '6'),
+    ('1', '7'), ('7', 'T'), ('7', 'Y'), ('4', 'A'), ('H', 'M'), ('K', 'X'),
+    ('C', 'O'), ('C', '0'), ('E', '8'), ('P', '9'),
+]
+
+# Стоимость операций: обычная замена, вставка и удаление - 1, замена похожих символов - 0.5
+CONFUSION_COST = 0.5
+_confusions = {frozenset(pair) for pair in CONFUSIONS}
+
+
+def substitution_cost(a, b):
+    if a == b:
+        return 0.0
+    if frozenset((a, b)) in _confusions:
+        return CONFUSION_COST
+    return 1.0
+
+
+# Взвешенное расстояние Левенштейна с учетом похожих символов
+def weighted_distance(a, b):
+    previous = [float(j) for j in range(len(b) + 1)]
+    for i, char_a in enumerate(a, 1):
+        current = [float(i)]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1.0,
+                               current[j - 1] + 1.0,
+                               previous[j - 1] + substitution_cost(char_a, char_b)))
+        previous = current
+    return previous[-1]
+
+
+# Все варианты строки с удалением не более max_edits символов
+def deletions(word, max_edits):
+    variants = {word}
+    for count in range(1, min(max_edits, len(word)) + 1):
+        for positions in combinations(range(len(word)), count):
+            variants.add(''.join(char for i, char in enumerate(word) if i not in positions))
+    return variants
+
+
+class FuzzyPlateIndex:
+    """
+    Индекс для нечеткого поиска номеров по окрестностям удалений (как в SymSpell).
+    Для каждого номера заранее сохраняются все варианты с удалением до max_edits символов.
+    Замена, вставка и удаление символа дают общий вариант у запроса и номера из базы,
+    поэтому кандидаты находятся за число обращений к словарю, не зависящее от размера базы.
+    Кандидаты проверяются взвешенным расстоянием Левенштейна.
+    max_distance - допустимое взвешенное расстояние (0.5 - одна замена похожих символов).
+    Самая дешевая ошибка стоит CONFUSION_COST, поэтому число удалений в индексе
+    выбирается так, чтобы находились все номера на расстоянии не больше max_distance.
+    """
+    def __init__(self, plates, max_distance=0.5):
+        self.max_distance = max_distance
+        self.max_edits = math.ceil(max_distance / CONFUSION_COST - 1e-9)
+        self.index = {}
+        for plate in plates:
+            for variant in deletions(plate, self.max_edits):
+                self.index.setdefault(variant, []).append(plate)
+
+    def candidates(self, number):
+        found = set()
+        for variant in deletions(number, self.max_edits):
+            found.update(self.index.get(variant, ()))
+        return found
+
+    def search(self, number, max_distance=None):
+        """
+        Возвращает список (номер, расстояние), отсортированный по расстоянию.
+        """
+        if max_distance is None:
+            max_distance = self.max_distance
+        matches = []
+        for plate in self.candidates(number):
+            distance = weighted_distance(number, plate)
+            if distance <= max_distance:
+                matches.append((plate, distance))
+        matches.sort(key=lambda match: (match[1], match[0]))
+        return matches
+
+    def best_match(self, number, max_distance=None):
+        """
+        Возвращает ближайший номер и расстояние до него или (None, None).
+        Если несколько номеров находятся на одинаковом расстоянии, совпадение считается неоднозначным.
+        """
+        matches = self.search(number, max_distance)
+        if not matches:
+            return None, None
+        if len(matches) > 1 and matches[1][1] == matches[0][1]:
+            return None, None
+        return matches[0]
+
+
+"""
+Модуль нечеткого сравнения номеров (fuzzyMatch.py)
+
+1. Взвешенное расстояние
+   - Расстояние Левенштейна с пониженной стоимостью замены похожих символов (O/0, B/8 и т.д.)
+   - Учет пропущенных и лишних символов, например цифры региона
+
+2. Индекс окрестностей удалений
+   - Предварительный расчет вариантов номеров с удалением символов
+   - Поиск кандидатов без перебора всей базы номеров
+   - Проверка кандидатов взвешенным расстоянием
+
+3. Принятие решения
+   - Возвращается ближайший номер и расстояние до него
+   - Неоднозначные совпадения не считаются найденными
+"""
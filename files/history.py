@@ -0,0 +1,90 @@
+import streamlit as st
+import os
+import datetime
+from files.eventStore import get_event_store
+
+# Количество событий на одной странице истории
+PAGE_SIZE = 50
+
+
+# Функция для отображения истории проездов из базы событий распознавания
+def detection_history():
+    st.header(":violet[История проездов]", divider='rainbow')
+
+    store = get_event_store()
+
+    # Фильтры в боковой панели
+    st.sidebar.header(":violet[Фильтры]", divider='rainbow')
+    plate = st.sidebar.text_input("Номер автомобиля (начало номера)").strip().upper()
+    camera = st.sidebar.selectbox("Камера", ["Все"] + store.cameras())
+    decision = st.sidebar.selectbox("Решение", ["Все", "MISS", "STOP"])
+    today = datetime.date.today()
+    period = st.sidebar.date_input("Период", (today - datetime.timedelta(days=7), today))
+
+    # Перевод периода в границы времени (конец периода включительно)
+    start = end = None
+    if isinstance(period, (list, tuple)) and len(period) == 2:
+        start = datetime.datetime.combine(period[0], datetime.time.min).timestamp()
+        end = datetime.datetime.combine(period[1] + datetime.timedelta(days=1), datetime.time.min).timestamp()
+
+    filters = {
+        "plate": plate or None,
+        "camera": None if camera == "Все" else camera,
+        "decision": None if decision == "Все" else decision,
+        "start": start,
+        "end": end
+    }
+
+    # Последний проезд для введенного номера
+    if plate:
+        last = store.last_seen(plate)
+        if last:
+            st.info(f"Последний проезд {plate}: "
+                    f"{datetime.datetime.fromtimestamp(last['ts']):%Y-%m-%d %H:%M:%S}, "
+                    f"камера {last['camera']}, решение {last['decision']}")
+
+    # Постраничный вывод: из базы читается только текущая страница
+    total = store.count(**filters)
+    pages = max(1, (total + PAGE_SIZE - 1) // PAGE_SIZE)
+    page = st.sidebar.number_input("Страница", min_value=1, max_value=pages, value=1)
+    events = store.query(**filters, limit=PAGE_SIZE, offset=(page - 1) * PAGE_SIZE)
+
+    st.write(f"Найдено событий: {total}, страница {page} из {pages}")
+    if not events:
+        st.info("События не найдены")
+        return
+
+    table = [{
+        "Время": datetime.datetime.fromtimestamp(event["ts"]).strftime("%Y-%m-%d %H:%M:%S"),
+        "Камера": event["camera"],
+        "Кадр": event["frame"],
+        "Номер": event["plate"],
+        "Решение": event["decision"],
+        "Уверенность": round(event["confidence"], 2) if event["confidence"] is not None else None,
+        "Расстояние": event["distance"],
+        "Пользователь": event["user"]
+    } for event in events]
+    st.dataframe(table, use_container_width=True)
+
+    # Просмотр изображения автомобиля для выбранного события
+    labels = [f"{row['Время']} {row['Номер']}" for row in table]
+    selected = st.selectbox("Изображение автомобиля", range(len(events)), format_func=lambda i: labels[i])
+    crop_path = events[selected]["crop_path"]
+    if crop_path and os.path.exists(crop_path):
+        st.image(crop_path, width=300)
+    else:
+        st.info("Изображение не найдено")
+
+"""
+Модуль истории проездов (history.py)
+
+1. Фильтры
+   - Поиск по началу номера автомобиля
+   - Выбор камеры и решения (MISS/STOP)
+   - Ограничение периода
+
+2. Вывод событий
+   - Постраничный вывод, из базы читается только текущая страница
+   - Последний проезд для введенного номера
+   - Просмотр изображения автомобиля для выбранного события
+"""
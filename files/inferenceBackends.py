@@ -0,0 +1,183 @@
+import os
+import shutil
+import time
+
+import numpy as np
+
+import files.settings as stg
+from files.tracking import iou_matrix
+
+# Поддерживаемые способы выполнения моделей
+# pytorch - исходные веса .pt, onnx - ONNX Runtime, openvino - OpenVINO (CPU)
+BACKENDS = ("pytorch", "onnx", "openvino")
+
+# Настройки выполнения модели по умолчанию
+# int8 - квантизация весов, imgsz - размер входа экспортированной модели,
+# data - набор данных для калибровки INT8 в OpenVINO (yaml ultralytics)
+DEFAULT_BACKEND = {"backend": "pytorch", "int8": False, "imgsz": 640, "data": None}
+
+
+# Настройки выполнения модели из файла настроек (ключ "backends")
+def model_config(name, settings=None):
+    if settings is None:
+        settings = stg.load_settings()
+    config = dict(DEFAULT_BACKEND)
+    config.update(settings.get("backends", {}).get(name, {}))
+    if config["backend"] not in BACKENDS:
+        raise ValueError(f"Неизвестный способ выполнения модели: {config['backend']}")
+    return config
+
+
+# Путь к экспортированной модели рядом с исходными весами
+def export_path(weights, backend, int8=False):
+    stem = os.path.splitext(weights)[0]
+    suffix = "_int8" if int8 else ""
+    if backend == "onnx":
+        return f"{stem}{suffix}.onnx"
+    if backend == "openvino":
+        return f"{stem}{suffix}_openvino_model"
+    return weights
+
+
+# Экспорт устарел, если его нет или исходные веса изменены после экспорта
+def _is_stale(path, weights):
+    return not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(weights)
+
+
+# Динамическая INT8-квантизация ONNX-модели
+# Метаданные ultralytics (классы, шаг сетки, размер входа) переносятся из исходной модели
+def _quantize_onnx(source, target):
+    import onnx
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(source, target, weight_type=QuantType.QUInt8)
+    metadata = onnx.load(source, load_external_data=False).metadata_props
+    quantized = onnx.load(target)
+    del quantized.metadata_props[:]
+    quantized.metadata_props.extend(metadata)
+    onnx.save(quantized, target)
+
+
+def export_model(weights, backend, int8=False, imgsz=640, data=None):
+    """
+    Экспортирует веса .pt для выбранного способа выполнения, если экспорт отсутствует или устарел.
+    Возвращает путь к модели, которую можно загрузить через YOLO.
+    Модели экспортируются с динамическим размером пакета для пакетного инференса.
+    """
+    path = export_path(weights, backend, int8)
+    if backend == "pytorch" or not _is_stale(path, weights):
+        return path
+
+    from ultralytics import YOLO
+
+    model = YOLO(weights)
+    if backend == "onnx":
+        exported = model.export(format="onnx", imgsz=imgsz, dynamic=True)
+        if int8:
+            _quantize_onnx(exported, path)
+        elif exported != path:
+            os.replace(exported, path)
+    else:
+        # Для INT8 OpenVINO калибрует модель на наборе данных data
+        exported = model.export(format="openvino", imgsz=imgsz, dynamic=True, int8=int8, data=data)
+        if os.path.abspath(exported) != os.path.abspath(path):
+            if os.path.exists(path):
+                shutil.rmtree(path)
+            os.replace(exported, path)
+    return path
+
+
+def load_model(weights, backend="pytorch", int8=False, imgsz=640, data=None):
+    """
+    Загружает модель с выбранным способом выполнения.
+    Интерфейс модели не зависит от способа выполнения: model(image) возвращает результаты ultralytics.
+    """
+    from ultralytics import YOLO
+
+    path = export_model(weights, backend, int8, imgsz, data)
+    if backend == "pytorch":
+        return YOLO(path)
+    return YOLO(path, task="detect")
+
+
+# Сопоставление рамок двух моделей одного изображения
+# Рамки сопоставляются жадно по убыванию IoU, только внутри одного класса
+def match_boxes(reference, candidate, iou_threshold=0.5):
+    ref_boxes, ref_cls, ref_conf = reference
+    cand_boxes, cand_cls, cand_conf = candidate
+    matches = []
+    if len(ref_boxes) and len(cand_boxes):
+        ious = iou_matrix(ref_boxes, cand_boxes)
+        ious[ref_cls[:, None] != cand_cls[None, :]] = 0.0
+        used_ref = set()
+        used_cand = set()
+        for flat in np.argsort(-ious, axis=None, kind="stable"):
+            i, j = np.unravel_index(flat, ious.shape)
+            if ious[i, j] < iou_threshold:
+                break
+            if i in used_ref or j in used_cand:
+                continue
+            used_ref.add(i)
+            used_cand.add(j)
+            matches.append((float(ious[i, j]), abs(float(ref_conf[i]) - float(cand_conf[j]))))
+    return matches
+
+
+def _boxes(result):
+    boxes = result.boxes
+    return (boxes.xyxy.cpu().numpy(), boxes.cls.cpu().numpy().astype(np.int32), boxes.conf.cpu().numpy())
+
+
+def check_accuracy(reference_model, candidate_model, images, iou_threshold=0.5, conf=0.25):
+    """
+    Сравнивает результаты модели-кандидата с эталонной моделью (PyTorch) на наборе изображений.
+    Возвращает долю найденных эталонных рамок (recall), долю совпавших рамок кандидата (precision),
+    средний IoU совпавших рамок, максимальное расхождение уверенности и среднее время на изображение.
+    """
+    reference_total = candidate_total = 0
+    matches = []
+    reference_time = candidate_time = 0.0
+    for image in images:
+        started = time.perf_counter()
+        reference = _boxes(reference_model(image, conf=conf, verbose=False)[0])
+        reference_time += time.perf_counter() - started
+
+        started = time.perf_counter()
+        candidate = _boxes(candidate_model(image, conf=conf, verbose=False)[0])
+        candidate_time += time.perf_counter() - started
+
+        reference_total += len(reference[0])
+        candidate_total += len(candidate[0])
+        matches += match_boxes(reference, candidate, iou_threshold)
+
+    count = max(1, len(images))
+    return {
+        "images": len(images),
+        "reference_boxes": reference_total,
+        "candidate_boxes": candidate_total,
+        "matched": len(matches),
+        "recall": len(matches) / reference_total if reference_total else 1.0,
+        "precision": len(matches) / candidate_total if candidate_total else 1.0,
+        "mean_iou": float(np.mean([iou for iou, _ in matches])) if matches else 0.0,
+        "max_conf_diff": max((diff for _, diff in matches), default=0.0),
+        "reference_ms": 1000 * reference_time / count,
+        "candidate_ms": 1000 * candidate_time / count,
+    }
+
+
+"""
+Модуль способов выполнения моделей (inferenceBackends.py)
+
+1. Способы выполнения
+   - PyTorch: исходные веса .pt
+   - ONNX Runtime: экспорт в ONNX, INT8 - динамическая квантизация весов
+   - OpenVINO: экспорт для процессоров Intel, INT8 - калибровка на наборе данных
+   - Способ выполнения задается для каждой модели в настройках (ключ "backends")
+
+2. Экспорт
+   - Экспортированные модели хранятся рядом с исходными весами
+   - Экспорт повторяется, если исходные веса изменились
+
+3. Проверка точности
+   - Сравнение рамок, классов и уверенности с результатами PyTorch на наборе изображений
+"""
@@ -0,0 +1,278 @@
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Имена счетчиков видеопотока
+COUNTERS = ("frames_decoded", "frames_inferred", "frames_skipped", "frames_dropped", "plate_reads", "crops_rejected",
+            "decisions")
+
+
+class StageTimer:
+    """
+    Таймер этапа: количество, суммарное время и последние замеры для перцентилей.
+    """
+    __slots__ = ("count", "total", "samples")
+
+    def __init__(self, window=256):
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=window)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.samples.append(seconds)
+
+    def snapshot(self):
+        samples = sorted(self.samples)
+        if not samples:
+            return {"count": self.count, "avg_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0}
+        return {
+            "count": self.count,
+            "avg_ms": 1000 * self.total / self.count,
+            "p50_ms": 1000 * samples[len(samples) // 2],
+            "p95_ms": 1000 * samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        }
+
+
+class _Measure:
+    __slots__ = ("timer", "started")
+
+    def __init__(self, timer):
+        self.timer = timer
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.observe(time.perf_counter() - self.started)
+        return False
+
+
+class _NoMeasure:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_no_measure = _NoMeasure()
+
+
+class StreamMetrics:
+    """
+    Счетчики и таймеры одного видеопотока.
+    Пишет в них только поток обработки этого видео, поэтому блокировки не нужны.
+    """
+    def __init__(self, name, enabled=True):
+        self.name = name
+        self.enabled = enabled
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.timers = {}
+        self.frame_times = deque(maxlen=120)
+        self.decision_times = deque(maxlen=1000)
+
+    def inc(self, counter, value=1):
+        if self.enabled:
+            self.counters[counter] += value
+
+    def frame(self):
+        # Отметка обработанного кадра для расчета FPS
+        if self.enabled:
+            self.counters["frames_decoded"] += 1
+            self.frame_times.append(time.monotonic())
+
+    def decision(self):
+        if self.enabled:
+            self.counters["decisions"] += 1
+            self.decision_times.append(time.monotonic())
+
+    def stage(self, name):
+        """
+        Контекстный менеджер для замера времени этапа.
+        """
+        if not self.enabled:
+            return _no_measure
+        timer = self.timers.get(name)
+        if timer is None:
+            timer = self.timers[name] = StageTimer()
+        return _Measure(timer)
+
+    def snapshot(self):
+        now = time.monotonic()
+        frame_times = list(self.frame_times)
+        fps = 0.0
+        if len(frame_times) > 1 and frame_times[-1] > frame_times[0]:
+            fps = (len(frame_times) - 1) / (frame_times[-1] - frame_times[0])
+        decisions_per_minute = sum(1 for t in list(self.decision_times) if now - t <= 60)
+        return {
+            "name": self.name,
+            "counters": dict(self.counters),
+            "fps": fps,
+            "decisions_per_minute": decisions_per_minute,
+            "stages": {name: timer.snapshot() for name, timer in list(self.timers.items())},
+        }
+
+
+class MetricsRegistry:
+    """
+    Реестр метрик процесса: видеопотоки, глубины очередей
+    и снимки метрик, полученные от рабочих процессов.
+    Видеопотоки различаются ключом (номером видеопотока), имя камеры - только подпись:
+    два видеопотока одного файла или камеры с одинаковыми именами не смешиваются.
+    """
+    def __init__(self):
+        self.enabled = True
+        self.lock = threading.Lock()
+        self.streams = {}
+        self.remote = {}
+        self.gauges = {}
+
+    def stream(self, key, name=None):
+        with self.lock:
+            metrics = self.streams.get(key)
+            if metrics is None:
+                metrics = self.streams[key] = StreamMetrics(key if name is None else name, self.enabled)
+            return metrics
+
+    # Глубина очереди: функция без аргументов, возвращающая текущий размер
+    def set_gauge(self, name, function):
+        with self.lock:
+            self.gauges[name] = function
+
+    def remove_gauge(self, name):
+        with self.lock:
+            self.gauges.pop(name, None)
+
+    # Снимок метрик видеопотока из рабочего процесса
+    def merge(self, key, snapshot):
+        with self.lock:
+            self.remote[key] = snapshot
+
+    def reset(self):
+        with self.lock:
+            self.streams.clear()
+            self.remote.clear()
+
+    def snapshot(self):
+        with self.lock:
+            streams = dict(self.remote)
+            local = list(self.streams.items())
+            gauges = list(self.gauges.items())
+        for key, metrics in local:
+            streams[key] = metrics.snapshot()
+        queues = {}
+        for name, function in gauges:
+            try:
+                queues[name] = function()
+            except Exception:
+                pass
+        return {"streams": streams, "queues": queues}
+
+    # Текстовый формат метрик (совместим с Prometheus)
+    def render_text(self):
+        snapshot = self.snapshot()
+        lines = []
+        for key, stream in _ordered(snapshot["streams"]):
+            label = f'stream="{_escape(stream.get("name", key))}",stream_id="{_escape(key)}"'
+            for counter, value in stream["counters"].items():
+                lines.append(f"pipeline_{counter}_total{{{label}}} {value}")
+            lines.append(f"pipeline_fps{{{label}}} {stream['fps']:.3f}")
+            lines.append(f"pipeline_decisions_per_minute{{{label}}} {stream['decisions_per_minute']}")
+            for stage, timer in sorted(stream["stages"].items()):
+                stage_label = f'{label},stage="{_escape(stage)}"'
+                lines.append(f"pipeline_stage_count{{{stage_label}}} {timer['count']}")
+                lines.append(f"pipeline_stage_latency_ms{{{stage_label},quantile=\"0.5\"}} {timer['p50_ms']:.3f}")
+                lines.append(f"pipeline_stage_latency_ms{{{stage_label},quantile=\"0.95\"}} {timer['p95_ms']:.3f}")
+        for name, depth in sorted(snapshot["queues"].items()):
+            lines.append(f'pipeline_queue_depth{{queue="{_escape(name)}"}} {depth}')
+        return "\n".join(lines) + "\n"
+
+    # Таблица для панели метрик в интерфейсе
+    def table(self):
+        rows = []
+        for key, stream in _ordered(self.snapshot()["streams"]):
+            counters = stream["counters"]
+            row = {
+                "№": key,
+                "Поток": stream.get("name", key),
+                "FPS": round(stream["fps"], 1),
+                "Декодировано": counters["frames_decoded"],
+                "Детекций": counters["frames_inferred"],
+                "Пропущено": counters["frames_skipped"],
+                "Отброшено": counters["frames_dropped"],
+                "Чтений номеров": counters["plate_reads"],
+                "Отклонено кадров": counters["crops_rejected"],
+                "Решений/мин": stream["decisions_per_minute"],
+            }
+            for stage, timer in sorted(stream["stages"].items()):
+                row[f"{stage} p95, мс"] = round(timer["p95_ms"], 1)
+            rows.append(row)
+        return rows
+
+
+# Значение метки в текстовом формате Prometheus: экранируются \, " и перевод строки
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Видеопотоки по порядку ключей (номера видеопотоков - числа, имена - строки)
+def _ordered(streams):
+    return sorted(streams.items(), key=lambda item: (not isinstance(item[0], int), str(item[0]).zfill(8)))
+
+
+# Общий реестр метрик процесса
+registry = MetricsRegistry()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = registry.render_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+# Запуск локального HTTP-сервера метрик (один раз на процесс)
+def start_http_server(port, host="127.0.0.1"):
+    global _server
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError:
+                return None
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+        return _server
+
+
+"""
+Модуль метрик обработки (metrics.py)
+
+1. Метрики видеопотоков
+   - Счетчики декодированных, обработанных детектором, пропущенных и отброшенных кадров
+   - Таймеры этапов обработки с перцентилями p50/p95
+   - FPS и количество решений в минуту
+
+2. Очереди
+   - Глубина очередей пакетного инференса, фоновой записи и базы событий
+
+3. Вывод метрик
+   - Панель метрик в боковой панели Streamlit
+   - Текстовые метрики по HTTP (http://127.0.0.1:<порт>/metrics)
+   - Метрики рабочих процессов передаются в основной процесс снимками
+"""
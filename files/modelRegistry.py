@@ -0,0 +1,72 @@
+import os
+import threading
+
+# Файлы весов моделей
+# plate - модель номерной пластины и символов, car - модель автомобилей
+MODEL_PATHS = {
+    # "plate": "main_diplom/files/model/yolo11_sym_plate.pt",
+    "plate": "main_diplom/files/model/yolo11_sym_plate_new.pt",
+    # "car": "main_diplom/files/model/yolo11cars.pt",
+    "car": "main_diplom/files/model/yolo11cars_new.pt",
+}
+
+# Загруженные модели хранятся на уровне модуля: модуль импортируется один раз на процесс,
+# поэтому модели переживают перезапуски скрипта Streamlit и общие для всех сессий
+_models = {}
+_locks = {name: threading.Lock() for name in MODEL_PATHS}
+
+
+def get_model(name):
+    """
+    Возвращает модель по имени, при первом обращении загружает ее.
+    """
+    model = _models.get(name)
+    if model is not None:
+        return model
+    if name not in MODEL_PATHS:
+        raise KeyError(f"Неизвестная модель: {name}")
+    # Одну модель загружает только один поток, остальные ждут и получают готовую
+    with _locks[name]:
+        model = _models.get(name)
+        if model is None:
+            # ultralytics (и torch) импортируются только при загрузке первой модели
+            # Способ выполнения (PyTorch, ONNX Runtime, OpenVINO) берется из настроек
+            from files.inferenceBackends import load_model, model_config
+            model = _models[name] = load_model(MODEL_PATHS[name], **model_config(name))
+    return model
+
+
+def is_loaded(name):
+    return name in _models
+
+
+def limit_threads(processes):
+    """
+    Делит ядра процессора поровну между processes рабочими процессами:
+    ограничивает число потоков torch и OpenMP в текущем процессе.
+    Без ограничения каждый процесс запускает столько потоков, сколько ядер,
+    и процессы мешают друг другу. Вызывается в рабочем процессе до загрузки моделей.
+    """
+    threads = max(1, (os.cpu_count() or 1) // max(1, processes))
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    try:
+        import torch
+    except ImportError:
+        return threads
+    torch.set_num_threads(threads)
+    return threads
+
+
+"""
+Модуль реестра моделей (modelRegistry.py)
+
+1. Ленивая загрузка
+   - Модели загружаются при первом использовании, а не при импорте модулей
+   - ultralytics импортируется только при загрузке первой модели
+   - Способ выполнения модели задается в настройках (inferenceBackends.py)
+
+2. Кэширование
+   - Загруженная модель хранится один раз на процесс
+   - Модели общие для всех сессий и перезапусков скрипта Streamlit
+   - Параллельные обращения к незагруженной модели не приводят к повторной загрузке
+"""
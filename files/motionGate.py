@@ -0,0 +1,91 @@
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    Предварительный фильтр движения перед детектором автомобилей.
+    Сравнивает уменьшенное полутоновое изображение зоны интереса с опорным кадром
+    (последним кадром, на котором запускался детектор). Если доля изменившихся пикселей
+    зоны меньше sensitivity, детектор на кадре не запускается.
+    Сравнивается описанный прямоугольник зоны, изменения учитываются только внутри маски зоны.
+    """
+    def __init__(self, zone=None, sensitivity=0.005, pixel_threshold=25, scale=0.25, max_skip=50):
+        self.zone = zone                        # зона интереса (Zone) или None - весь кадр
+        self.sensitivity = sensitivity          # Минимальная доля изменившихся пикселей
+        self.pixel_threshold = pixel_threshold  # Порог изменения яркости пикселя
+        self.scale = scale                      # Масштаб уменьшения области перед сравнением
+        self.max_skip = max_skip                # Максимум пропущенных кадров подряд
+        self.reference = None
+        self.mask = None                        # уменьшенная маска зоны для сравнения
+        self.mask_pixels = 0
+        self.skipped_in_row = 0
+        self.frames = 0
+        self.skipped = 0
+
+    # Подготовка уменьшенного полутонового изображения области
+    def _prepare(self, frame):
+        region_mask = None
+        if self.zone is not None and self.zone.defined:
+            x1, y1, x2, y2 = self.zone.bounds(frame.shape)
+            if x2 > x1 and y2 > y1:
+                region_mask = self.zone.region_mask(frame.shape)
+                frame = frame[y1:y2, x1:x2]
+        small = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        
+        # Маска зоны уменьшается один раз под размер изображения для сравнения
+        if region_mask is not None and (self.mask is None or self.mask.shape != gray.shape):
+            self.mask = cv2.resize(region_mask.astype(np.uint8), (gray.shape[1], gray.shape[0]),
+                                   interpolation=cv2.INTER_NEAREST).astype(bool)
+            self.mask_pixels = max(1, int(np.count_nonzero(self.mask)))
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def check(self, frame):
+        """
+        Возвращает True, если на кадре нужно запустить детектор.
+        """
+        self.frames += 1
+        gray = self._prepare(frame)
+
+        if self.reference is None or self.reference.shape != gray.shape:
+            motion = True
+        elif self.skipped_in_row >= self.max_skip:
+            # Периодически запускаем детектор, даже если движения нет
+            motion = True
+        else:
+            diff = cv2.absdiff(gray, self.reference) > self.pixel_threshold
+            if self.mask is not None:
+                changed = np.count_nonzero(diff & self.mask) / self.mask_pixels
+            else:
+                changed = np.count_nonzero(diff) / diff.size
+            motion = changed >= self.sensitivity
+
+        if motion:
+            # Опорный кадр обновляется только при запуске детектора,
+            # поэтому медленное движение накапливается и не теряется
+            self.reference = gray
+            self.skipped_in_row = 0
+        else:
+            self.skipped_in_row += 1
+            self.skipped += 1
+        return motion
+
+    @property
+    def skip_ratio(self):
+        return self.skipped / self.frames if self.frames else 0.0
+
+
+"""
+Модуль фильтра движения (motionGate.py)
+
+1. Фильтр движения
+   - Сравнение зоны интереса с опорным кадром по разности яркости
+   - Учитываются только изменения внутри многоугольника зоны
+   - Пропуск детектора автомобилей на кадрах без изменений
+   - Периодический принудительный запуск детектора
+
+2. Настройка
+   - Чувствительность задается для каждой камеры в настройках зоны интереса
+   - Учет доли пропущенных кадров для отображения
+"""
@@ -0,0 +1,68 @@
+import cv2
+import numpy as np
+
+# Ширина, до которой уменьшается изображение при оценке резкости
+SHARPNESS_WIDTH = 160
+
+
+# Резкость: дисперсия лапласиана нижней половины изображения автомобиля (там находится номер)
+def sharpness(image):
+    height, width = image.shape[:2]
+    if height < 2 or width < 2:
+        return 0.0
+    lower = image[height // 2:]
+    if width > SHARPNESS_WIDTH:
+        scale = SHARPNESS_WIDTH / width
+        lower = cv2.resize(lower, (SHARPNESS_WIDTH, max(1, int(lower.shape[0] * scale))),
+                           interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(lower, cv2.COLOR_BGR2GRAY) if lower.ndim == 3 else lower
+    return float(cv2.Laplacian(gray, cv2.CV_32F).var())
+
+
+def quality_score(image, confidence, sharpness_ref=100.0, size_ref=120):
+    """
+    Оценка пригодности изображения автомобиля для распознавания номера от 0 до 1.
+    Учитываются уверенность детекции, резкость и высота изображения:
+    резкость и высота нормируются на sharpness_ref и size_ref (при больших значениях оценка не растет).
+    """
+    sharp = min(1.0, sharpness(image) / sharpness_ref)
+    size = min(1.0, image.shape[0] / size_ref)
+    return float(np.clip(confidence, 0.0, 1.0)) * sharp * size
+
+
+class BestCrop:
+    """
+    Выбор лучшего изображения автомобиля в окне из нескольких кадров.
+    """
+    def __init__(self):
+        self.frames = 0
+        self.score = -1.0
+        self.image = None
+
+    def add(self, image, score):
+        self.frames += 1
+        if score > self.score:
+            self.score = score
+            self.image = image
+
+    def take(self):
+        # Возвращает лучшее изображение окна и его оценку, окно начинается заново
+        image, score = self.image, self.score
+        self.frames = 0
+        self.score = -1.0
+        self.image = None
+        return image, score
+
+
+"""
+Модуль оценки качества изображения номера (plateQuality.py)
+
+1. Оценка качества
+   - Резкость: дисперсия лапласиана нижней части изображения автомобиля
+   - Размер изображения автомобиля
+   - Уверенность детекции автомобиля
+
+2. Выбор лучшего кадра
+   - Из нескольких последовательных кадров в модель номеров передается лучший
+   - Изображения с оценкой ниже порога в модель номеров не передаются
+"""
@@ -0,0 +1,85 @@
+from collections import defaultdict
+
+
+class PlateVote:
+    """
+    Накопление прочитанных номеров одного автомобиля на нескольких кадрах.
+    Сначала голосованием выбирается длина номера, затем для каждой позиции - символ.
+    Голос каждого прочтения взвешивается уверенностью распознавания.
+    """
+    def __init__(self):
+        self.reads = []          # (номер, уверенность) непустых прочтений
+        self.empty = 0           # прочтения, в которых номер не найден
+        self.previous = None     # результат голосования до последнего прочтения
+        self.current = None      # результат голосования после последнего прочтения
+
+    def add(self, auto_number, confidence):
+        if not auto_number:
+            self.empty += 1
+            return
+        self.previous = self.current
+        self.reads.append((auto_number, max(float(confidence or 0.0), 1e-3)))
+        self.current = self.consensus()[0]
+
+    def consensus(self):
+        """
+        Возвращает (номер, согласие): согласие - минимальная по позициям доля веса
+        прочтений, голосовавших за выбранный символ.
+        """
+        if not self.reads:
+            return '', 0.0
+
+        lengths = defaultdict(float)
+        for number, weight in self.reads:
+            lengths[len(number)] += weight
+        # При равенстве весов выигрывает длина, встретившаяся раньше
+        length = max(lengths, key=lengths.get)
+        reads = [(number, weight) for number, weight in self.reads if len(number) == length]
+        total = lengths[length]
+
+        chars = []
+        agreement = 1.0
+        for position in range(length):
+            votes = defaultdict(float)
+            for number, weight in reads:
+                votes[number[position]] += weight
+            char = max(votes, key=votes.get)
+            chars.append(char)
+            agreement = min(agreement, votes[char] / total)
+        return ''.join(chars), agreement
+
+    def confidence(self):
+        # Средняя уверенность прочтений, совпавших с результатом голосования
+        number = self.current
+        weights = [weight for read, weight in self.reads if read == number]
+        if not weights:
+            weights = [weight for read, weight in self.reads if len(read) == len(number or '')]
+        return sum(weights) / len(weights) if weights else 0.0
+
+    def is_stable(self, min_reads=2, agreement=0.6):
+        """
+        Результат считается устойчивым, если прочитано не меньше min_reads номеров,
+        последнее прочтение совпало с результатом и не изменило его, а согласие не ниже agreement.
+        """
+        if len(self.reads) < min_reads or not self.current:
+            return False
+        if min_reads > 1 and (self.current != self.previous or self.reads[-1][0] != self.current):
+            return False
+        return self.consensus()[1] >= agreement
+
+
+"""
+Модуль голосования по номерам (plateVoting.py)
+
+1. Накопление прочтений
+   - Номер одного автомобиля читается на нескольких кадрах
+   - Пустые прочтения учитываются отдельно
+
+2. Голосование
+   - Выбор длины номера по сумме уверенностей прочтений
+   - Выбор символа на каждой позиции по сумме уверенностей
+   - Согласие - минимальная по позициям доля голосов за выбранный символ
+
+3. Досрочное завершение
+   - Распознавание прекращается, когда результат голосования перестал меняться
+"""
@@ -0,0 +1,150 @@
+import hashlib
+import io
+import os
+import re
+import threading
+import time
+
+from files.fuzzyMatch import FuzzyPlateIndex
+
+# Файл базы номеров, которым разрешен проезд
+DB_PATH = 'users/admin/data/the_base_of_admission.csv'
+
+
+# Приведение номера к единому виду: только буквы и цифры в верхнем регистре
+def normalize_number(number):
+    return re.sub(r'[^\w]', '', str(number)).strip().upper()
+
+
+class PlateWhitelist:
+    """
+    Индекс базы разрешенных номеров в памяти.
+    Номера хранятся в хеш-множестве, поэтому проверка выполняется за O(1).
+    Файл базы перечитывается только при изменении времени модификации или размера,
+    а набор номеров пересобирается только при изменении содержимого (SHA-256).
+    Индекс можно использовать одновременно из нескольких потоков.
+    Для номеров с ошибками распознавания строится индекс нечеткого поиска.
+    """
+    def __init__(self, path=DB_PATH, check_interval=1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self.plates = frozenset()
+        self.mtime = None
+        self.size = None
+        self.digest = None
+        self.last_check = None
+        self.fuzzy = None
+        self.fuzzy_plates = None
+
+    # Разбор файла базы: столбец "Номер авто"
+    # pandas импортируется только при первом чтении базы
+    def _parse(self, data):
+        import pandas as pd
+        try:
+            column = pd.read_csv(io.BytesIO(data))['Номер авто']
+        except Exception:
+            return frozenset()
+        plates = (normalize_number(number) for number in column.dropna())
+        return frozenset(plate for plate in plates if plate and plate != 'NAN')
+
+    def refresh(self, force=False):
+        # Проверка файла не чаще одного раза в check_interval секунд
+        now = time.monotonic()
+        if not force and self.last_check is not None and now - self.last_check < self.check_interval:
+            return
+
+        with self.lock:
+            if not force and self.last_check is not None and now - self.last_check < self.check_interval:
+                return
+            self.last_check = now
+
+            try:
+                stat = os.stat(self.path)
+            except OSError:
+                if self.digest is not None:
+                    self.plates = frozenset()
+                self.mtime = self.size = self.digest = None
+                return
+
+            if (stat.st_mtime_ns, stat.st_size) == (self.mtime, self.size):
+                return
+
+            with open(self.path, 'rb') as f:
+                data = f.read()
+            digest = hashlib.sha256(data).hexdigest()
+            self.mtime, self.size = stat.st_mtime_ns, stat.st_size
+
+            # Время изменилось, но содержимое то же самое: индекс не пересобираем
+            if digest == self.digest:
+                return
+
+            # Замена множества целиком: читающие потоки видят либо старый, либо новый набор
+            self.plates = self._parse(data)
+            self.digest = digest
+
+    def contains(self, auto_number):
+        self.refresh()
+        return normalize_number(auto_number) in self.plates
+
+    # Индекс нечеткого поиска строится при первом обращении после загрузки базы
+    def _fuzzy_index(self, plates, max_distance):
+        with self.lock:
+            if self.fuzzy is None or self.fuzzy_plates is not plates or self.fuzzy.max_distance != max_distance:
+                self.fuzzy = FuzzyPlateIndex(plates, max_distance)
+                self.fuzzy_plates = plates
+            return self.fuzzy
+
+    def match(self, auto_number, max_distance=0.5):
+        """
+        Поиск номера в базе с учетом ошибок распознавания.
+        max_distance - допустимое взвешенное расстояние (см. fuzzyMatch), 0 - точное сравнение.
+        Возвращает (номер из базы, расстояние) или (None, None), если совпадение не найдено.
+        Точное совпадение имеет расстояние 0.
+        """
+        self.refresh()
+        number = normalize_number(auto_number)
+        if not number:
+            return None, None
+        plates = self.plates
+        if number in plates:
+            return number, 0.0
+        if max_distance <= 0:
+            return None, None
+        return self._fuzzy_index(plates, max_distance).best_match(number)
+
+    def __len__(self):
+        self.refresh()
+        return len(self.plates)
+
+
+# Общие индексы для всех потоков процесса
+_whitelists = {}
+_whitelists_lock = threading.Lock()
+
+def get_whitelist(path=DB_PATH):
+    with _whitelists_lock:
+        if path not in _whitelists:
+            _whitelists[path] = PlateWhitelist(path)
+        return _whitelists[path]
+
+
+"""
+Модуль базы разрешенных номеров (plateWhitelist.py)
+
+1. Индекс номеров
+   - Загрузка базы номеров один раз и хранение в хеш-множестве
+   - Проверка номера за O(1) без обращения к диску
+
+2. Отслеживание изменений
+   - Проверка времени модификации и размера файла не чаще раза в секунду
+   - Пересборка индекса только при изменении содержимого файла
+
+3. Многопоточность
+   - Один общий индекс на процесс для всех видеопотоков
+   - Атомарная замена набора номеров при перезагрузке
+
+4. Нечеткий поиск
+   - Поиск номеров с ошибками распознавания через индекс fuzzyMatch
+   - Возврат расстояния до найденного номера
+"""
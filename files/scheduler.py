@@ -0,0 +1,155 @@
+import threading
+import time
+
+
+class _Stream:
+    __slots__ = ("key", "generator", "priority", "ready", "vtime", "seq")
+
+    def __init__(self, key, generator, priority, ready, vtime, seq):
+        self.key = key
+        self.generator = generator
+        self.priority = priority
+        self.ready = ready
+        self.vtime = vtime
+        self.seq = seq
+
+
+class StreamScheduler:
+    """
+    Планировщик видеопотоков на фиксированном числе рабочих потоков.
+    Видеопоток - генератор, один шаг которого обрабатывает один кадр (iter_stream).
+    Рабочий поток берет видеопоток с наименьшим виртуальным временем, выполняет один шаг
+    и возвращает его в очередь. Виртуальное время растет на затраченное время, деленное на приоритет,
+    поэтому процессорное время делится между видеопотоками пропорционально приоритетам.
+    Видеопоток, у которого нет нового кадра (ready() == False), пропускается и не занимает рабочий поток.
+    """
+    def __init__(self, workers=4, on_result=None, on_error=None, on_done=None, stop=None):
+        self.workers = max(1, workers)
+        self.on_result = on_result
+        self.on_error = on_error
+        self.on_done = on_done
+        self.external_stop = stop
+        self.condition = threading.Condition()
+        self.queue = []          # видеопотоки, ожидающие следующего шага
+        self.pending = 0         # видеопотоки, которые еще не закончились
+        self.stop_requested = False
+        self.seq = 0
+        self.threads = []
+        self.slices = 0
+
+    def add(self, key, generator, priority=1.0, ready=None):
+        """
+        Добавляет видеопоток. key передается в функции обратного вызова.
+        ready - функция без аргументов: есть ли у видеопотока новый кадр (None - всегда есть).
+        """
+        with self.condition:
+            # Новый видеопоток начинает с текущего минимального времени и не получает долг за прошлое
+            vtime = min((stream.vtime for stream in self.queue), default=0.0)
+            self.queue.append(_Stream(key, generator, max(float(priority), 0.01), ready, vtime, self.seq))
+            self.seq += 1
+            self.pending += 1
+            self.condition.notify()
+
+    def is_stopping(self):
+        return self.stop_requested or (self.external_stop is not None and self.external_stop())
+
+    def _pick(self):
+        best = None
+        for stream in self.queue:
+            if stream.ready is not None and not stream.ready():
+                continue
+            if best is None or (stream.vtime, stream.seq) < (best.vtime, best.seq):
+                best = stream
+        if best is not None:
+            self.queue.remove(best)
+        return best
+
+    def _work(self):
+        while True:
+            with self.condition:
+                while True:
+                    if self.pending == 0 or self.is_stopping():
+                        self.condition.notify_all()
+                        return
+                    stream = self._pick()
+                    if stream is not None:
+                        break
+                    # Нет видеопотоков с новыми кадрами: ждем недолго и проверяем снова
+                    self.condition.wait(0.005)
+
+            started = time.perf_counter()
+            finished = False
+            try:
+                item = next(stream.generator)
+            except StopIteration:
+                finished = True
+            except Exception as e:
+                finished = True
+                if self.on_error is not None:
+                    self.on_error(stream.key, e)
+            else:
+                if self.on_result is not None:
+                    self.on_result(stream.key, item)
+            elapsed = time.perf_counter() - started
+
+            with self.condition:
+                self.slices += 1
+                if finished:
+                    self.pending -= 1
+                else:
+                    stream.vtime += elapsed / stream.priority
+                    self.queue.append(stream)
+                self.condition.notify()
+            if finished and self.on_done is not None:
+                self.on_done(stream.key)
+
+    def start(self):
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._work, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def run(self):
+        # Выполнение в текущем потоке (рабочий процесс с одним потоком обработки)
+        try:
+            self._work()
+        finally:
+            self._close()
+
+    def is_alive(self):
+        return any(thread.is_alive() for thread in self.threads)
+
+    def stop(self):
+        with self.condition:
+            self.stop_requested = True
+            self.condition.notify_all()
+
+    def join(self):
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+        self._close()
+
+    def _close(self):
+        # Незаконченные видеопотоки закрываются, чтобы освободить видеофайлы и камеры
+        with self.condition:
+            streams, self.queue = self.queue, []
+        for stream in streams:
+            stream.generator.close()
+
+
+"""
+Модуль планировщика видеопотоков (scheduler.py)
+
+1. Рабочие потоки
+   - Фиксированное число рабочих потоков независимо от количества видеопотоков
+   - Один шаг видеопотока - обработка одного кадра
+
+2. Справедливое распределение
+   - Процессорное время делится между видеопотоками пропорционально приоритетам
+   - Видеопотоки без нового кадра (камеры) не занимают рабочие потоки
+
+3. Остановка
+   - Незаконченные видеопотоки закрываются, видеофайлы и камеры освобождаются
+"""
@@ -0,0 +1,73 @@
+import copy
+import json
+import os
+
+# Файл для хранения настроек обработки видео
+SETTINGS_FILE = "users/settings.json"
+
+# Настройки по умолчанию
+DEFAULT_SETTINGS = {
+    "processing_mode": "threads",   # threads - потоки, processes - рабочие процессы
+    "stream_workers": 2,            # Количество рабочих процессов
+    "scheduler_workers": 4,         # Количество потоков обработки (режим потоков), не зависит от числа видео
+    "fuzzy_max_distance": 0.5,      # Допустимое расстояние до номера из базы (0.5 - одна замена похожих символов, 0 - точное сравнение)
+    "motion_gate": True,            # Пропуск детектора на кадрах без движения в зоне интереса
+    "motion_sensitivity": 0.005,    # Доля изменившихся пикселей зоны, при которой запускается детектор
+    "roi_inference": True,          # Детекция только в прямоугольнике зоны интереса
+    "roi_pad": 0.02,                # Запас вокруг зоны интереса (доля размера кадра)
+    "roi_pad_top": 0.3,             # Запас над зоной интереса (доля высоты кадра)
+    "single_pass": True,            # Пластина и символы номера за один проход модели номеров
+    "single_pass_min_plate_height": 32,  # Минимальная высота пластины (пикс.) для одного прохода
+    "vote_min_reads": 2,            # Минимум прочтений номера для решения (1 - решение по первому прочтению)
+    "vote_max_reads": 6,            # Максимум попыток прочтения номера одного автомобиля
+    "vote_agreement": 0.6,          # Минимальная доля голосов за каждый символ номера
+    "quality_gate": True,           # Распознавание номера только на лучшем кадре из окна
+    "quality_window": 3,            # Количество кадров в окне выбора лучшего изображения
+    "quality_min_score": 0.15,      # Минимальная оценка изображения для распознавания номера (0..1)
+    "quality_read_last_attempt": False,  # На последней попытке распознавать лучшее изображение, даже если оценка ниже порога
+    "quality_sharpness_ref": 100.0, # Резкость (дисперсия лапласиана), выше которой оценка не растет
+    "quality_size_ref": 120,        # Высота изображения автомобиля (пикс.), выше которой оценка не растет
+    "writer_queue_size": 256,       # Размер очереди фоновой записи на диск
+    "writer_policy": "drop",        # При переполнении очереди: drop - отбросить изображение, block - ждать
+    "realtime_replay": False,       # Воспроизведение видеофайлов в реальном времени (как камеры)
+    "stream_sources": [],           # Живые источники: пары [имя камеры, адрес потока или номер устройства]
+    "upload_cache_bytes": 10 * 1024 ** 3,  # Максимальный размер кэша загруженных видео (байт)
+    "preview_width": 960,           # Ширина кадров для настройки зоны интереса (пикс.)
+    "preview_samples": 200,         # Максимум кадров видео для выбора при настройке зоны интереса
+    "preview_cache_videos": 20,     # Максимум видео, кадры которых хранятся для настройки зоны интереса
+    "display_fps": 10,              # Максимальная частота обновления видео в интерфейсе
+    "display_width": 640,           # Ширина кадра при выводе в интерфейс (пикс.)
+    "display_jpeg_quality": 80,     # Качество JPEG при выводе в интерфейс
+    "display_columns": 3,           # Количество видео в строке
+    "display_rows": 2,              # Количество строк видео на странице
+    "display_page_seconds": 10,     # Время показа одной страницы видео (с), если видео больше, чем помещается
+    "metrics_enabled": True,        # Сбор метрик обработки
+    "metrics_port": 9108,           # Порт локального HTTP-сервера метрик (/metrics)
+    "backends": {                   # Способ выполнения моделей: pytorch, onnx или openvino, int8 - квантизация
+        "car": {"backend": "pytorch", "int8": False},
+        "plate": {"backend": "pytorch", "int8": False},
+    },
+}
+
+# Функция для загрузки настроек из файла
+# Отсутствующие в файле параметры берутся из настроек по умолчанию
+def load_settings():
+    # Копия вложенных словарей: изменение настроек не меняет настройки по умолчанию
+    settings = copy.deepcopy(DEFAULT_SETTINGS)
+    if os.path.exists(SETTINGS_FILE):
+        try:
+            with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
+                settings.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+    return settings
+
+# Функция для сохранения настроек в файл
+# Сохраняются только параметры, отличающиеся от настроек по умолчанию,
+# поэтому новые значения по умолчанию применяются и к уже сохраненным настройкам
+def save_settings(settings):
+    changed = {key: value for key, value in settings.items()
+               if key not in DEFAULT_SETTINGS or DEFAULT_SETTINGS[key] != value}
+    os.makedirs(os.path.dirname(SETTINGS_FILE), exist_ok=True)
+    with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
+        json.dump(changed, f, ensure_ascii=False, indent=4)
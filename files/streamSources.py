@@ -0,0 +1,195 @@
+import collections
+import os
+import threading
+import time
+
+import cv2
+
+# Адреса сетевых видеопотоков
+LIVE_PREFIXES = ("rtsp://", "rtsps://", "rtmp://", "http://", "https://", "udp://", "tcp://")
+
+# Количество последних кадров, которые хранит читатель живого источника
+READER_SLOTS = 2
+
+
+# Номер устройства ("0") преобразуется в число, остальные источники остаются строками
+def parse_source(source):
+    if isinstance(source, int):
+        return source
+    source = str(source).strip()
+    return int(source) if source.isdigit() else source
+
+
+# Живой источник: камера (номер устройства, /dev/video*) или сетевой поток
+def is_live(source):
+    source = parse_source(source)
+    if isinstance(source, int):
+        return True
+    return source.startswith("/dev/video") or source.lower().startswith(LIVE_PREFIXES)
+
+
+# Открытие источника через OpenCV
+def open_capture(source):
+    source = parse_source(source)
+    if isinstance(source, str) and source.lower().startswith(LIVE_PREFIXES):
+        # RTSP по TCP: без потерь пакетов и артефактов на кадрах
+        os.environ.setdefault("OPENCV_FFMPEG_CAPTURE_OPTIONS", "rtsp_transport;tcp")
+        cap = cv2.VideoCapture(source, cv2.CAP_FFMPEG)
+    else:
+        cap = cv2.VideoCapture(source)
+    if is_live(source):
+        # Внутренняя очередь кадров OpenCV минимальна (поддерживается не всеми драйверами)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+
+class LatestFrameReader:
+    """
+    Чтение живого источника в отдельном потоке.
+    Хранит только slots последних кадров: если обработка не успевает за камерой,
+    старые кадры вытесняются новыми, и задержка решения не растет.
+    При обрыве сетевого потока выполняется переподключение.
+    С realtime=True видеофайл воспроизводится со скоростью записи и заменяет камеру при проверке.
+    Интерфейс совместим с cv2.VideoCapture: isOpened, read, release.
+    """
+    def __init__(self, source, slots=READER_SLOTS, realtime=False, reconnect_delay=2.0, max_reconnects=5,
+                 stop=None):
+        self.source = parse_source(source)
+        self.live = is_live(self.source)
+        self.realtime = realtime
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnects = max_reconnects
+        self.stop = stop
+        self.frames = collections.deque(maxlen=slots)
+        self.condition = threading.Condition()
+        self.ended = False
+        self.closing = False
+        self.captured = 0
+        self.dropped = 0
+        self.reconnects = 0
+        self.cap = open_capture(self.source)
+        self.thread = None
+
+    def start(self):
+        if self.cap.isOpened():
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+        else:
+            self.ended = True
+        return self
+
+    def _reconnect(self):
+        # Переподключение к сетевому потоку или камере, False - попытки исчерпаны
+        self.cap.release()
+        for _ in range(self.max_reconnects):
+            deadline = time.monotonic() + self.reconnect_delay
+            while time.monotonic() < deadline:
+                if self.closing:
+                    return False
+                time.sleep(0.1)
+            self.cap = open_capture(self.source)
+            self.reconnects += 1
+            if self.cap.isOpened():
+                return True
+        return False
+
+    def _run(self):
+        fps = self.cap.get(cv2.CAP_PROP_FPS) or 25.0
+        interval = 1.0 / fps
+        next_time = time.monotonic()
+        try:
+            while not self.closing:
+                ret, frame = self.cap.read()
+                if not ret:
+                    if self.live and self._reconnect():
+                        continue
+                    break
+
+                # Видеофайл в реальном времени: следующий кадр не раньше, чем его покажет камера
+                if self.realtime and not self.live:
+                    next_time += interval
+                    delay = next_time - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    else:
+                        next_time = time.monotonic()
+
+                with self.condition:
+                    if len(self.frames) == self.frames.maxlen:
+                        self.dropped += 1
+                    self.frames.append(frame)
+                    self.captured += 1
+                    self.condition.notify()
+        finally:
+            with self.condition:
+                self.ended = True
+                self.condition.notify_all()
+
+    # Есть ли непрочитанный кадр (или источник закончился и read не будет ждать)
+    def has_frame(self):
+        return bool(self.frames) or self.ended
+
+    def isOpened(self):
+        return not self.ended or bool(self.frames)
+
+    def read(self):
+        # Ожидание следующего кадра; (False, None) - источник закончился или обработка остановлена
+        with self.condition:
+            while not self.frames and not self.ended:
+                if self.stop is not None and self.stop():
+                    return False, None
+                self.condition.wait(0.5)
+            if self.frames:
+                return True, self.frames.popleft()
+            return False, None
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def release(self):
+        self.closing = True
+        if self.thread is not None:
+            self.thread.join()
+        self.cap.release()
+
+
+# Открытие источника для обработки
+# Живые источники и файлы в режиме реального времени читаются через LatestFrameReader,
+# записанные видео при обычной обработке читаются покадрово без пропусков
+def open_source(source, realtime=False, stop=None):
+    if is_live(source) or realtime:
+        return LatestFrameReader(source, realtime=realtime, stop=stop).start()
+    return open_capture(source)
+
+
+# Разбор списка камер из интерфейса: по одной в строке, "имя;адрес"
+# Если имя не указано, именем камеры считается адрес
+def parse_sources(text):
+    sources = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        name, _, source = line.partition(";")
+        if not source:
+            name, source = line, line
+        sources.append((name.strip(), source.strip()))
+    return sources
+
+
+"""
+Модуль источников видео (streamSources.py)
+
+1. Источники
+   - Видеофайлы
+   - Сетевые потоки (RTSP, RTMP, HTTP)
+   - Локальные камеры (номер устройства или /dev/video*)
+
+2. Чтение живых источников
+   - Отдельный поток чтения на каждый источник
+   - Хранятся только последние кадры, устаревшие кадры отбрасываются
+   - Переподключение при обрыве потока
+
+3. Проверка без камеры
+   - Видеофайл воспроизводится со скоростью записи, как живой источник
+"""
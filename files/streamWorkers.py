@@ -0,0 +1,248 @@
+import multiprocessing as mp
+import queue
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import cv2
+import numpy as np
+
+from files.streamSources import open_capture
+
+# Количество кадров в кольцевом буфере одного видеопотока
+RING_SLOTS = 4
+
+
+class FrameRing:
+    """
+    Кольцевой буфер кадров в общей памяти.
+    Родительский процесс создает буфер, рабочий процесс подключается к нему по имени
+    и записывает кадры в слоты по кругу. Через очередь передается только номер слота.
+    """
+    def __init__(self, frame_bytes, slots=RING_SLOTS, name=None):
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=frame_bytes * slots)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            # Буфером владеет родительский процесс, рабочий процесс его не удаляет
+            try:
+                resource_tracker.unregister(self.shm._name, "shared_memory")
+            except Exception:
+                pass
+        self.frame_bytes = frame_bytes
+        self.slots = slots
+        self.next_slot = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, frame):
+        slot = self.next_slot
+        view = np.ndarray(frame.shape, dtype=np.uint8, buffer=self.shm.buf, offset=slot * self.frame_bytes)
+        view[...] = frame
+        del view
+        self.next_slot = (slot + 1) % self.slots
+        return slot
+
+    def read(self, slot, shape):
+        view = np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf, offset=slot * self.frame_bytes)
+        frame = view.copy()
+        del view
+        return frame
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+# Определение размера кадра видео в байтах для выделения общей памяти
+def probe_frame_bytes(filename):
+    cap = open_capture(filename)
+    try:
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if width <= 0 or height <= 0:
+            ret, frame = cap.read()
+            if not ret:
+                raise IOError(f"Не удалось открыть видео: {filename}")
+            height, width = frame.shape[:2]
+    finally:
+        cap.release()
+    return width * height * 3
+
+
+# Рабочий процесс: декодирование, инференс и распознавание номеров для назначенных ему видеопотоков
+# Видеопотоки процесса делят его процессорное время по приоритетам (scheduler.py)
+def stream_worker(tasks, messages, free_slots, stop_event, user, processes=1):
+    # Ядра делятся между рабочими процессами до загрузки моделей
+    from files.modelRegistry import limit_threads
+    limit_threads(processes)
+    import files.videoProcessing as vp
+    from files.scheduler import StreamScheduler
+
+    rings = {}
+    stats = {}
+    metrics = {}
+    last_snapshot = {}
+
+    def on_result(position, result):
+        frame_res, events = result
+        # Если интерфейс не успевает забирать кадры, кадр не передается, но решения передаются всегда
+        slot = None
+        ring = rings[position]
+        if frame_res.nbytes <= ring.frame_bytes and free_slots[position].acquire(block=False):
+            slot = ring.write(frame_res)
+        else:
+            metrics[position].inc("frames_dropped")
+        # Снимок метрик передается в основной процесс не чаще раза в секунду
+        message_stats = dict(stats[position])
+        if time.monotonic() - last_snapshot[position] >= 1.0:
+            message_stats["metrics"] = metrics[position].snapshot()
+            last_snapshot[position] = time.monotonic()
+        if slot is not None or events or "metrics" in message_stats:
+            messages.put(("frame", position, slot, frame_res.shape, events, message_stats))
+
+    def on_error(position, error):
+        messages.put(("error", position, None, None, str(error), None))
+
+    def on_done(position):
+        rings.pop(position).close()
+        messages.put(("done", position, None, None, None, None))
+
+    scheduler = StreamScheduler(1, on_result=on_result, on_error=on_error, on_done=on_done,
+                                stop=stop_event.is_set)
+    try:
+        for position, filename, camera, ring_name, frame_bytes in tasks:
+            rings[position] = FrameRing(frame_bytes, name=ring_name)
+            stats[position] = {}
+            metrics[position] = vp.mt.registry.stream(position, camera["name"])
+            last_snapshot[position] = 0.0
+            try:
+                vp.schedule_stream(scheduler, position, filename, camera, user, stats=stats[position])
+            except Exception as e:
+                on_error(position, e)
+                on_done(position)
+        scheduler.run()
+    finally:
+        for ring in rings.values():
+            ring.close()
+        # Перед завершением процесса дописываем на диск изображения, журналы и события
+        vp.get_writer().stop()
+        vp.get_event_store().stop()
+
+
+class StreamProcessPool:
+    """
+    Пул рабочих процессов для обработки видеопотоков.
+    Видеопотоки распределяются между процессами по сумме приоритетов,
+    внутри процесса видеопотоки обрабатываются по очереди кадр за кадром.
+    Кадры с результатами возвращаются через кольцевые буферы в общей памяти.
+    """
+    def __init__(self, workers, user=None):
+        self.ctx = mp.get_context("spawn")
+        self.workers = workers
+        self.user = user
+        self.processes = []
+        self.rings = []
+        self.messages = None
+        self.stop_event = self.ctx.Event()
+
+    def run(self, video_files, cameras, stop=None):
+        """
+        Запускает обработку и возвращает генератор (позиция, кадр, решения, статистика, ошибка).
+        """
+        self.messages = self.ctx.Queue()
+        free_slots = [self.ctx.Semaphore(RING_SLOTS) for _ in video_files]
+
+        tasks = []
+        for position, filename in enumerate(video_files):
+            try:
+                ring = FrameRing(probe_frame_bytes(filename))
+            except Exception as e:
+                self.rings.append(None)
+                yield position, None, None, None, str(e)
+                continue
+            self.rings.append(ring)
+            tasks.append((position, filename, cameras[position], ring.name, ring.frame_bytes))
+        remaining = len(tasks)
+
+        # Видеопотоки с большим приоритетом распределяются первыми, каждый - в наименее загруженный процесс
+        count = min(self.workers, remaining)
+        assignments = [[] for _ in range(count)]
+        loads = [0.0] * count
+        for task in sorted(tasks, key=lambda task: -task[2].get("priority", 1)):
+            worker = loads.index(min(loads))
+            assignments[worker].append(task)
+            loads[worker] += task[2].get("priority", 1)
+
+        for worker_tasks in assignments:
+            process = self.ctx.Process(target=stream_worker,
+                                       args=(worker_tasks, self.messages, free_slots, self.stop_event, self.user,
+                                             count),
+                                       daemon=True)
+            process.start()
+            self.processes.append(process)
+
+        while remaining:
+            if stop is not None and stop():
+                break
+            try:
+                kind, position, slot, shape, payload, stats = self.messages.get(timeout=0.1)
+            except queue.Empty:
+                if not any(process.is_alive() for process in self.processes):
+                    break
+                continue
+
+            if kind == "done":
+                remaining -= 1
+            elif kind == "error":
+                yield position, None, None, None, payload
+            else:
+                frame = None
+                if slot is not None:
+                    frame = self.rings[position].read(slot, shape)
+                    free_slots[position].release()
+                yield position, frame, payload, stats, None
+
+    def close(self):
+        self.stop_event.set()
+
+        # Забираем оставшиеся сообщения, чтобы рабочие процессы могли завершиться
+        if self.messages is not None:
+            try:
+                while True:
+                    self.messages.get_nowait()
+            except (queue.Empty, OSError, ValueError):
+                pass
+
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+
+        for ring in self.rings:
+            if ring is not None:
+                ring.close()
+        self.rings = []
+
+
+"""
+Модуль рабочих процессов (streamWorkers.py)
+
+1. Рабочие процессы
+   - Декодирование видео, инференс моделей и распознавание номеров вне процесса Streamlit
+   - Количество процессов задается в настройках обработки и не зависит от количества видео
+   - Видеопотоки распределяются между процессами по приоритетам
+   - Внутри процесса видеопотоки обрабатываются по очереди кадр за кадром
+
+2. Общая память
+   - Для каждого видеопотока создается кольцевой буфер кадров
+   - Кадры передаются без сериализации, по очереди передается только номер слота
+   - Если интерфейс не успевает, кадры отбрасываются, решения по автомобилям сохраняются
+"""
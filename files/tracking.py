@@ -0,0 +1,121 @@
+import numpy as np
+
+
+# Вычисление матрицы IoU между двумя наборами прямоугольников (x1, y1, x2, y2)
+def iou_matrix(boxes_a, boxes_b):
+    a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-6)
+
+
+class Track:
+    """
+    Состояние одного автомобиля в зоне интереса.
+    Хранит последнюю рамку и результат распознавания номера.
+    """
+    def __init__(self, track_id, box, class_id):
+        self.track_id = track_id
+        self.box = box
+        self.class_id = class_id
+        self.missed = 0          # Сколько кадров подряд трек не был найден
+        self.attempts = 0        # Сколько раз запускалось распознавание номера
+        self.resolved = False    # Решение по автомобилю уже принято
+        self.auto_number = ''
+        self.allowed = None      # True - MISS, False - STOP, None - решения нет
+        self.distance = None     # Расстояние до найденного номера из базы
+        self.vote = None         # Голосование по прочтениям номера на нескольких кадрах (PlateVote)
+        self.best_crop = None    # Лучшее изображение автомобиля в текущем окне кадров (BestCrop)
+        self.last_crop = None    # Изображение автомобиля, на котором номер читался последним
+
+
+class Tracker:
+    """
+    Простой трекер по перекрытию рамок (IoU).
+    Присваивает автомобилям в зоне интереса постоянные номера треков,
+    чтобы распознавание номера выполнялось один раз на каждый въезд в зону.
+    Трек удаляется, если автомобиль не встречается в зоне max_missed кадров подряд.
+    Удаленные на последнем обновлении треки без решения доступны в expired.
+    """
+    def __init__(self, iou_threshold=0.3, max_missed=10, max_attempts=5):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.max_attempts = max_attempts
+        self.tracks = {}
+        self.next_id = 1
+        self.expired = []        # Треки без решения, удаленные при последнем обновлении
+
+    def update(self, boxes, class_ids):
+        """
+        Сопоставляет рамки текущего кадра с существующими треками.
+        Возвращает список треков в том же порядке, что и входные рамки.
+        """
+        tracks = list(self.tracks.values())
+        assigned = [None] * len(boxes)
+        self.expired = []
+        used = set()
+
+        if tracks and len(boxes):
+            ious = iou_matrix(boxes, [track.box for track in tracks])
+            # Жадное сопоставление: сначала пары с наибольшим перекрытием
+            candidates = np.argwhere(ious >= self.iou_threshold)
+            order = np.argsort(-ious[candidates[:, 0], candidates[:, 1]], kind='stable')
+            for i, j in candidates[order]:
+                if assigned[i] is not None or j in used:
+                    continue
+                track = tracks[j]
+                track.box = boxes[i]
+                track.class_id = class_ids[i]
+                track.missed = 0
+                assigned[i] = track
+                used.add(j)
+
+        # Новые автомобили в зоне интереса получают новые треки
+        for i, box in enumerate(boxes):
+            if assigned[i] is None:
+                track = Track(self.next_id, box, class_ids[i])
+                self.tracks[track.track_id] = track
+                self.next_id += 1
+                assigned[i] = track
+
+        # Треки автомобилей, покинувших зону, устаревают и удаляются
+        matched_ids = {track.track_id for track in assigned}
+        for track_id in list(self.tracks):
+            if track_id in matched_ids:
+                continue
+            track = self.tracks[track_id]
+            track.missed += 1
+            if track.missed > self.max_missed:
+                del self.tracks[track_id]
+                if not track.resolved:
+                    self.expired.append(track)
+
+        return assigned
+
+    def active_tracks(self):
+        # Треки, которые присутствуют в зоне на текущем кадре
+        return [track for track in self.tracks.values() if track.missed == 0]
+
+
+"""
+Модуль отслеживания автомобилей (tracking.py)
+
+1. Трекер
+   - Сопоставление рамок автомобилей между кадрами по IoU
+   - Постоянные номера треков для каждого автомобиля в зоне интереса
+   - Удаление треков после выхода автомобиля из зоны
+   - Треки без решения, удаленные при обновлении, передаются для принятия решения
+
+2. Состояние трека
+   - Результат распознавания номера и решение MISS/STOP
+   - Счетчик попыток распознавания для нераспознанных номеров
+"""
@@ -0,0 +1,140 @@
+import hashlib
+import os
+import tempfile
+import threading
+
+import files.settings as stg
+
+# Папка для сохраненных загруженных видео
+CACHE_DIR = "users/upload_cache"
+
+# Размер блока при записи загруженного файла на диск
+CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class UploadCache:
+    """
+    Кэш загруженных видео на диске.
+    Файл записывается блоками и сохраняется под именем по хешу содержимого (sha256),
+    поэтому одно и то же видео хранится один раз, а при перезапуске скрипта Streamlit
+    повторно не записывается. Если размер кэша превышает max_bytes,
+    удаляются давно не использовавшиеся файлы.
+    """
+    def __init__(self, directory=CACHE_DIR, max_bytes=10 * 1024 ** 3):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        # Идентификатор загрузки -> путь к файлу в кэше
+        self.paths = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def _touch(self, path):
+        # Время изменения файла - время последнего использования для вытеснения
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def spool(self, uploaded_files):
+        """
+        Возвращает пути к файлам в кэше для загруженных файлов Streamlit (UploadedFile).
+        Файлы текущей загрузки при вытеснении не удаляются.
+        """
+        paths = [self._spool(uploaded_file) for uploaded_file in uploaded_files]
+        self.evict(keep=paths)
+        return paths
+
+    def _spool(self, uploaded_file):
+        # Идентификатор загрузки есть в новых версиях Streamlit, без него файл хешируется заново
+        key = getattr(uploaded_file, "file_id", None)
+        with self.lock:
+            path = self.paths.get(key) if key else None
+        if path and os.path.exists(path):
+            self._touch(path)
+            return path
+
+        # Запись блоками во временный файл с одновременным расчетом хеша
+        extension = os.path.splitext(uploaded_file.name)[1].lower() or ".mp4"
+        digest = hashlib.sha256()
+        uploaded_file.seek(0)
+        with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".part", delete=False) as tmp_file:
+            try:
+                while True:
+                    chunk = uploaded_file.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    tmp_file.write(chunk)
+            except BaseException:
+                tmp_file.close()
+                os.unlink(tmp_file.name)
+                raise
+        uploaded_file.seek(0)
+
+        path = os.path.join(self.directory, digest.hexdigest() + extension)
+        if os.path.exists(path):
+            # Такое видео уже есть в кэше
+            os.unlink(tmp_file.name)
+            self._touch(path)
+        else:
+            os.replace(tmp_file.name, path)
+
+        if key:
+            with self.lock:
+                self.paths[key] = path
+        return path
+
+    def evict(self, keep=()):
+        """
+        Удаляет давно не использовавшиеся файлы, пока размер кэша больше max_bytes.
+        Файлы из keep не удаляются.
+        """
+        with self.lock:
+            files = []
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and not entry.name.endswith(".part"):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in files)
+            keep = {os.path.abspath(path) for path in keep}
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                if os.path.abspath(path) in keep:
+                    continue
+                try:
+                    os.unlink(path)
+                except OSError:
+                    # Файл открыт другой обработкой (Windows)
+                    continue
+                total -= size
+            removed = set(path for _, _, path in files if not os.path.exists(path))
+            self.paths = {key: path for key, path in self.paths.items() if path not in removed}
+
+    def size(self):
+        return sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.is_file())
+
+
+# Общий кэш загрузок для всех сессий процесса
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_upload_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = UploadCache(max_bytes=stg.load_settings()["upload_cache_bytes"])
+        return _cache
+
+
+"""
+Модуль кэша загруженных видео (uploadCache.py)
+
+1. Сохранение загрузок
+   - Загруженное видео записывается на диск блоками, без лишней копии в памяти
+   - Имя файла - хеш содержимого (sha256), одинаковые видео хранятся один раз
+   - При перезапуске скрипта Streamlit уже сохраненный файл используется повторно
+
+2. Ограничение размера
+   - При превышении размера кэша удаляются давно не использовавшиеся файлы
+"""
@@ -0,0 +1,215 @@
+import json
+import math
+import os
+import shutil
+import threading
+
+import cv2
+
+import files.settings as stg
+from files.uploadCache import get_upload_cache
+
+# Папка для уменьшенных кадров видео
+PREVIEW_DIR = "users/preview_cache"
+
+
+class VideoPreview:
+    """
+    Уменьшенные кадры видео для настройки зоны интереса.
+    Индекс видео (частота кадров, число кадров, размер кадра, шаг выборки) строится один раз
+    и вместе с кадрами хранится в папке, имя которой - хеш содержимого видео.
+    Кадры берутся с шагом step, поэтому их не больше samples на видео.
+    Кадр декодируется один раз (при первом запросе или фоновым заполнением),
+    затем читается из кэша. Повторная загрузка видео того же содержимого использует готовый кэш.
+    """
+    def __init__(self, path, key, directory=PREVIEW_DIR, max_width=960, samples=200):
+        self.path = path
+        self.directory = os.path.join(directory, key)
+        self.max_width = max_width
+        self.samples = samples
+        self.lock = threading.Lock()
+        self.cap = None
+        self.thread = None
+        self.stopped = False     # кадры вытеснены из кэша, заполнение прекращается
+        os.makedirs(self.directory, exist_ok=True)
+        self.index = self._load_index() or self._build_index()
+
+    def _load_index(self):
+        try:
+            with open(os.path.join(self.directory, "index.json"), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _build_index(self):
+        cap = cv2.VideoCapture(self.path)
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+            frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            if frames <= 0:
+                # Контейнер не сообщает число кадров: считаем кадры чтением видео (один раз для видео)
+                frames = 0
+                while cap.grab():
+                    frames += 1
+        finally:
+            cap.release()
+        index = {
+            "fps": fps,
+            "frames": frames,
+            "width": width,
+            "height": height,
+            "step": max(1, math.ceil(frames / max(self.samples, 1))),
+        }
+        if frames > 0:
+            tmp_path = os.path.join(self.directory, f"index.{os.getpid()}.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(index, f)
+            os.replace(tmp_path, os.path.join(self.directory, "index.json"))
+        return index
+
+    @property
+    def duration(self):
+        return self.index["frames"] / self.index["fps"]
+
+    @property
+    def step_seconds(self):
+        return self.index["step"] / self.index["fps"]
+
+    # Номер кадра выборки, ближайшего к моменту seconds
+    def frame_number(self, seconds):
+        step = self.index["step"]
+        number = int(round(seconds * self.index["fps"] / step)) * step
+        return max(0, min(number, max(self.index["frames"] - 1, 0) // step * step))
+
+    def _path(self, number):
+        return os.path.join(self.directory, f"{number:08d}.jpg")
+
+    def _decode(self, number):
+        # Переход к кадру и его декодирование; видео остается открытым для следующих переходов
+        if self.cap is None:
+            self.cap = cv2.VideoCapture(self.path)
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, number)
+        ret, frame = self.cap.read()
+        if not ret:
+            return None
+        height, width = frame.shape[:2]
+        if width > self.max_width:
+            frame = cv2.resize(frame, (self.max_width, int(height * self.max_width / width)),
+                               interpolation=cv2.INTER_AREA)
+        return frame
+
+    def thumbnail(self, number):
+        """
+        Путь к уменьшенному кадру number (JPEG) или None, если кадр не удалось прочитать.
+        """
+        path = self._path(number)
+        if os.path.exists(path):
+            return path
+        with self.lock:
+            if self.stopped:
+                return None
+            if os.path.exists(path):
+                return path
+            frame = self._decode(number)
+            if frame is None:
+                return None
+            tmp_path = f"{path}.{os.getpid()}.tmp.jpg"
+            cv2.imwrite(tmp_path, frame)
+            os.replace(tmp_path, path)
+        return path
+
+    def _fill(self):
+        try:
+            for number in range(0, self.index["frames"], self.index["step"]):
+                if self.thumbnail(number) is None:
+                    break
+        finally:
+            # Все кадры выборки в кэше: декодер больше не нужен
+            self.close()
+
+    def close(self, stop=False):
+        # Освобождение декодера; при следующем запросе кадра видео откроется заново
+        # stop=True - кадры вытесняются из кэша, новые кадры больше не декодируются
+        with self.lock:
+            self.stopped = self.stopped or stop
+            if self.cap is not None:
+                self.cap.release()
+                self.cap = None
+
+    def start(self):
+        # Фоновое заполнение кэша всеми кадрами выборки, чтобы ползунок не ждал декодирования
+        with self.lock:
+            if self.thread is None and self.index["frames"] > 0:
+                self.thread = threading.Thread(target=self._fill, daemon=True)
+                self.thread.start()
+        return self
+
+
+# Кадры уже открытых видео: путь к видео в кэше загрузок -> VideoPreview
+_previews = {}
+_previews_lock = threading.Lock()
+
+def _evict(keep, max_videos, directory=PREVIEW_DIR):
+    """
+    Удаляет кадры видео, вытесненных из кэша загрузок, и кадры давно не использовавшихся видео,
+    если видео в кэше кадров больше max_videos. Кадры видео keep не удаляются.
+    Вызывается под _previews_lock.
+    """
+    uploads = get_upload_cache().directory
+    alive = {os.path.splitext(entry.name)[0] for entry in os.scandir(uploads) if entry.is_file()}
+    folders = sorted(((entry.stat().st_mtime, entry.path, entry.name) for entry in os.scandir(directory)
+                      if entry.is_dir()), reverse=True)
+    removed = set()
+    kept = 0
+    for _, folder, key in folders:
+        if os.path.abspath(folder) == os.path.abspath(keep):
+            continue
+        # Время изменения папки - время последнего использования кадров
+        if key in alive and kept < max_videos - 1:
+            kept += 1
+            continue
+        removed.add(os.path.abspath(folder))
+
+    for path, preview in list(_previews.items()):
+        if os.path.abspath(preview.directory) in removed or not os.path.exists(path):
+            preview.close(stop=True)
+            del _previews[path]
+    for folder in removed:
+        shutil.rmtree(folder, ignore_errors=True)
+
+def get_preview(path):
+    """
+    Возвращает VideoPreview для видео из кэша загрузок.
+    Имя файла в кэше загрузок - хеш содержимого, он же используется как ключ кэша кадров.
+    """
+    with _previews_lock:
+        settings = stg.load_settings()
+        preview = _previews.get(path)
+        if preview is None:
+            key = os.path.splitext(os.path.basename(path))[0]
+            preview = VideoPreview(path, key, max_width=settings["preview_width"],
+                                   samples=settings["preview_samples"]).start()
+            _previews[path] = preview
+        try:
+            os.utime(preview.directory)
+        except OSError:
+            pass
+        _evict(preview.directory, settings["preview_cache_videos"])
+        return preview
+
+
+"""
+Модуль кадров для настройки зоны интереса (videoPreview.py)
+
+1. Индекс видео
+   - Частота кадров, число кадров и размер кадра определяются один раз для видео
+   - Кадры берутся с постоянным шагом, не больше заданного количества на видео
+
+2. Кэш кадров
+   - Уменьшенные кадры хранятся на диске в папке по хешу содержимого видео
+   - Кадр декодируется один раз, при повторном выборе читается из кэша
+   - Кэш заполняется в фоновом потоке, пока администратор выбирает кадр
+   - Кадры видео, удаленных из кэша загрузок, и давно не использовавшихся видео удаляются
+"""
@@ -0,0 +1,153 @@
+import json
+import os
+
+import cv2
+import numpy as np
+
+# Папка с настройками зон интереса камер
+ZONES_DIR = "users/coordinates"
+
+
+# Многоугольник из старой настройки зоны интереса: четыре линии (x, y, yz, xz)
+# В части старых настроек сохранены только правая и верхняя границы [x, y]:
+# такая зона продолжается до левого и нижнего края кадра
+def legacy_polygon(intersection, width, height):
+    if not intersection or len(intersection) < 2:
+        return None
+    if len(intersection) >= 4:
+        x, y, yz, xz = intersection[:4]
+    else:
+        x, y = intersection[:2]
+        yz, xz = height, 0
+    x1, x2 = sorted((int(xz), int(x)))
+    y1, y2 = sorted((int(y), int(yz)))
+    if x2 <= x1 or y2 <= y1:
+        return None
+    return [[x1, y1], [x2, y1], [x2, y2], [x1, y2]]
+
+
+def migrate_config(data):
+    """
+    Переводит старую настройку зоны интереса в многоугольник.
+    Возвращает (настройка, изменена ли настройка). Старые поля сохраняются.
+    """
+    if "polygon" in data:
+        return data, False
+    data = dict(data)
+    data["polygon"] = legacy_polygon(data.get("intersection"),
+                                     data.get("frame_width", 0), data.get("frame_height", 0))
+    return data, True
+
+
+def save_zone_config(name, data, directory=ZONES_DIR):
+    # Запись через временный файл: рабочие процессы не прочитают недописанную настройку
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}.json")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def load_zone_config(name, directory=ZONES_DIR, save_migrated=True):
+    """
+    Загружает настройку зоны интереса камеры.
+    Старая настройка автоматически переводится в многоугольник и (при save_migrated) перезаписывается.
+    """
+    with open(os.path.join(directory, f"{name}.json"), "r") as f:
+        data = json.load(f)
+    data, changed = migrate_config(data)
+    if changed and save_migrated:
+        try:
+            save_zone_config(name, data, directory)
+        except OSError:
+            # Нет прав на запись: настройка переводится заново при следующей загрузке
+            pass
+    return data
+
+
+class Zone:
+    """
+    Зона интереса камеры - многоугольник в координатах кадра размера frame_size (ширина, высота).
+    Для размера кадра видео многоугольник один раз переводится в маску,
+    после чего проверка попадания точки в зону - обращение к одному элементу маски.
+    Если размер кадра отличается от frame_size, многоугольник масштабируется.
+    Зона без многоугольника занимает весь кадр.
+    """
+    def __init__(self, polygon=None, frame_size=None):
+        if polygon is not None and len(polygon) >= 3:
+            self.polygon = [[int(x), int(y)] for x, y in polygon]
+        else:
+            self.polygon = None
+        self.frame_size = tuple(frame_size) if frame_size else None
+        self.shape = None
+        self.points = None   # вершины многоугольника в координатах кадра
+        self.mask = None     # (высота, ширина) bool
+        self.rect = None     # описанный прямоугольник (x1, y1, x2, y2)
+
+    @classmethod
+    def from_config(cls, data):
+        frame_size = None
+        if data.get("frame_width") and data.get("frame_height"):
+            frame_size = (data["frame_width"], data["frame_height"])
+        return cls(data.get("polygon"), frame_size)
+
+    @property
+    def defined(self):
+        return self.polygon is not None
+
+    def compile(self, shape):
+        # Маска строится один раз для размера кадра
+        height, width = shape[:2]
+        if self.shape == (height, width):
+            return self
+        if self.polygon is None:
+            points = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.int32)
+        else:
+            points = np.array(self.polygon, dtype=np.float32)
+            if self.frame_size and tuple(self.frame_size) != (width, height):
+                points *= np.array([width / self.frame_size[0], height / self.frame_size[1]], dtype=np.float32)
+            points = np.round(points).astype(np.int32)
+        mask = np.zeros((height, width), dtype=np.uint8)
+        cv2.fillPoly(mask, [points], 1)
+        x, y, w, h = cv2.boundingRect(points)
+        self.points = points
+        self.mask = mask.astype(bool)
+        self.rect = (max(0, x), max(0, y), min(width, x + w), min(height, y + h))
+        self.shape = (height, width)
+        return self
+
+    def contains(self, points, shape):
+        """
+        Попадание точек (N, 2) с координатами (x, y) в зону интереса.
+        Точки за краем кадра переносятся на край кадра.
+        """
+        self.compile(shape)
+        height, width = self.shape
+        points = np.asarray(points).reshape(-1, 2)
+        x = np.clip(points[:, 0].astype(np.int64), 0, width - 1)
+        y = np.clip(points[:, 1].astype(np.int64), 0, height - 1)
+        return self.mask[y, x]
+
+    def bounds(self, shape):
+        return self.compile(shape).rect
+
+    # Маска зоны внутри описанного прямоугольника
+    def region_mask(self, shape):
+        x1, y1, x2, y2 = self.bounds(shape)
+        return self.mask[y1:y2, x1:x2]
+
+
+"""
+Модуль зон интереса (zones.py)
+
+1. Зона интереса
+   - Многоугольник произвольной формы для каждой камеры
+   - Маска зоны строится один раз для размера кадра
+   - Проверка попадания автомобиля в зону - обращение к элементам маски
+   - Описанный прямоугольник для детекции по зоне интереса и фильтра движения
+
+2. Настройки зон
+   - Хранение в users/coordinates/<камера>.json
+   - Автоматический перевод старых настроек (четыре линии или две границы) в многоугольник
+"""
@@ -2,10 +2,9 @@ import streamlit as st
 import hashlib
 import json
 import os
-import files.profile as pf
-import files.editData as ed
-import files.adminSettingsVideoZone as asvz
-import files.videoProcessing as vp
+
+# Модули страниц импортируются при открытии страницы, чтобы страница входа
+# не ждала загрузки cv2, pandas и моделей распознавания
 
 # Файл для хранения базы данных пользователей
 os.makedirs(f'users', exist_ok=True)
@@ -55,20 +54,28 @@ def personal_account_admin():
     # Создание переключателя страниц
     page = st.sidebar.radio("Выберите пункт:", 
                             ["👤 Профиль", "⚙️ Настройка зоны интереса", 
-                             "📋 Создание / редактирование базы номеров", "🎥 Обработка видео"])
+                             "📋 Создание / редактирование базы номеров", "🎥 Обработка видео",
+                             "🗂 История проездов"])
 
     st.sidebar.markdown("---")
    
     # Отображение выбранной страницы и соответствующей боковой панели
     if page == "👤 Профиль":
+        import files.profile as pf
         pf.user_profile()
     elif page == "⚙️ Настройка зоны интереса":
+        import files.adminSettingsVideoZone as asvz
         asvz.video_zone()
         asvz.area_of_interest()
     elif page == "📋 Создание / редактирование базы номеров":
+        import files.editData as ed
         ed.edit_data()
     elif page == "🎥 Обработка видео":
+        import files.videoProcessing as vp
         vp.main()
+    elif page == "🗂 История проездов":
+        import files.history as hs
+        hs.detection_history()
     
     st.sidebar.markdown("---")
     
@@ -89,15 +96,20 @@ def personal_account():
     
     # Создание переключателя страниц
     page = st.sidebar.radio("Выберите пункт:", 
-                            ["👤 Профиль", "🎥 Обработка видео"])
+                            ["👤 Профиль", "🎥 Обработка видео", "🗂 История проездов"])
 
     st.sidebar.markdown("---")
    
     # Отображение выбранной страницы и соответствующей боковой панели
     if page == "👤 Профиль":
+        import files.profile as pf
         pf.user_profile()
     elif page == "🎥 Обработка видео":
+        import files.videoProcessing as vp
         vp.main()
+    elif page == "🗂 История проездов":
+        import files.history as hs
+        hs.detection_history()
    
     st.sidebar.markdown("---")
     
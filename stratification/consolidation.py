@@ -1,36 +1,158 @@
 import os
+import csv
 import shutil
+import hashlib
 import numpy as np
 import matplotlib.pyplot as plt
-from collections import Counter
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from sklearn.model_selection import train_test_split
 
-def consolidate_files(source_dirs, target_dir):
-    image_extensions = ('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff')
-    label_extensions = ('.txt',)
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff')
+LABEL_EXTENSIONS = ('.txt',)
 
+# ioctl FICLONE (Linux): copy-on-write copy of a file on btrfs / xfs
+FICLONE = 0x40049409
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def reflink(src, dst):
+    import fcntl
+    with open(src, 'rb') as s, open(dst, 'wb') as d:
+        try:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        except OSError:
+            d.close()
+            os.unlink(dst)
+            raise
+
+
+# Place src at dst without copying data where the file system allows it
+# mode: 'copy' - real copy, 'link' - reflink, then hardlink, then copy
+def link_or_copy(src, dst, mode='copy'):
+    if os.path.lexists(dst):
+        os.unlink(dst)
+    if mode == 'link':
+        for method in (reflink, os.link):
+            try:
+                method(src, dst)
+                return method.__name__
+            except (OSError, ImportError):
+                # Cross-device link, unsupported file system or platform: try the next method
+                continue
+    shutil.copy2(src, dst)
+    return 'copy'
+
+
+# Run link_or_copy for (src, dst) pairs in a thread pool, returns Counter of methods used
+def place_files(pairs, mode='copy', workers=8):
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return Counter(pool.map(lambda pair: link_or_copy(pair[0], pair[1], mode), pairs))
+
+
+# Directory of a sample: images/ and labels/ of one split are the same directory,
+# so train/images/a.jpg is paired with train/labels/a.txt and not with valid/labels/a.txt
+def sample_directory(root):
+    root = os.path.normpath(os.path.abspath(root))
+    parent, last = os.path.split(root)
+    return parent if last.lower() in ('images', 'labels') else root
+
+
+def consolidate_files(source_dirs, target_dir, mode='copy', workers=8):
+    """
+    Collects images and labels from source_dirs into target_dir/images and target_dir/labels.
+    A sample is an image and a label with the same name in one directory (see sample_directory).
+    Samples with the same name from different directories, including subdirectories of one source
+    directory (train/images/a.jpg and valid/images/a.jpg), are compared by content hash:
+    exact duplicates are stored once, different samples get the hash appended to the name.
+    mode='link' uses reflinks or hardlinks for images where possible, labels are always copied
+    because replace_class_labels edits them in place.
+    Writes target_dir/manifest.csv: target name, target files, source files and hash.
+    """
     image_dir = os.path.join(target_dir, 'images')
     label_dir = os.path.join(target_dir, 'labels')
 
     os.makedirs(image_dir, exist_ok=True)
     os.makedirs(label_dir, exist_ok=True)
 
+    # (sample directory, name) -> {'image': path, 'label': path}
+    samples = defaultdict(dict)
     for source_dir in source_dirs:
         for root, _, files in os.walk(source_dir):
+            directory = sample_directory(root)
             for file in files:
-                file_path = os.path.join(root, file)
-                file_extension = os.path.splitext(file)[1].lower()
+                name, file_extension = os.path.splitext(file)
+                file_extension = file_extension.lower()
+
+                if file_extension in IMAGE_EXTENSIONS:
+                    samples[(directory, name)]['image'] = os.path.join(root, file)
+                elif file_extension in LABEL_EXTENSIONS:
+                    samples[(directory, name)]['label'] = os.path.join(root, file)
+
+    # Name collisions between sample directories are resolved by content hash
+    by_name = defaultdict(list)
+    for key in samples:
+        by_name[key[1]].append(key)
+    colliding = [key for keys in by_name.values() if len(keys) > 1 for key in keys]
+
+    def sample_hash(key):
+        digest = hashlib.sha256()
+        for kind in ('image', 'label'):
+            if kind in samples[key]:
+                digest.update(file_hash(samples[key][kind]).encode())
+        return digest.hexdigest()
 
-                if file_extension in image_extensions:
-                    destination = os.path.join(image_dir, file)
-                elif file_extension in label_extensions:
-                    destination = os.path.join(label_dir, file)
-                else:
-                    continue
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        hashes = dict(zip(colliding, pool.map(sample_hash, colliding)))
 
-                shutil.copy2(file_path, destination)
+    rows = []
+    image_pairs, label_pairs = [], []
+    duplicates = renamed = 0
+    for name, keys in sorted(by_name.items()):
+        # Only samples that really differ get the hash in the name
+        distinct = len({hashes.get(key, '') for key in keys}) > 1
+        seen = set()
+        for key in sorted(keys):
+            sample = samples[key]
+            digest = hashes.get(key, '')
+            if digest in seen:
+                duplicates += 1
+                continue
+            seen.add(digest)
+            target_name = f"{name}_{digest[:8]}" if distinct else name
+            renamed += distinct
+
+            row = {'name': target_name, 'image': '', 'label': '',
+                   'source_image': sample.get('image', ''), 'source_label': sample.get('label', ''),
+                   'sha256': digest}
+            if 'image' in sample:
+                file = target_name + os.path.splitext(sample['image'])[1]
+                row['image'] = os.path.join('images', file)
+                image_pairs.append((sample['image'], os.path.join(image_dir, file)))
+            if 'label' in sample:
+                file = target_name + os.path.splitext(sample['label'])[1]
+                row['label'] = os.path.join('labels', file)
+                label_pairs.append((sample['label'], os.path.join(label_dir, file)))
+            rows.append(row)
+
+    methods = place_files(image_pairs, mode, workers)
+    methods.update(place_files(label_pairs, 'copy', workers))
+
+    with open(os.path.join(target_dir, 'manifest.csv'), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=['name', 'image', 'label', 'source_image', 'source_label', 'sha256'])
+        writer.writeheader()
+        writer.writerows(rows)
 
     print(f"Files consolidated successfully in {target_dir}")
+    print(f"Samples: {len(rows)}, renamed on collision: {renamed}, duplicates skipped: {duplicates}, "
+          f"files: {dict(methods)}")
     return image_dir, label_dir
 
 def get_class_labels(label_dir):
@@ -68,7 +190,10 @@ def replace_class_labels(label_dir, class_mapping):
     print(f"Class labels replaced successfully in {label_dir}")
 
 
-def stratify_and_split_dataset(image_dir, label_dir, output_dir, train_ratio=0.6, val_ratio=0.2, test_ratio=0.2):
+# mode: 'copy' - copy files into split directories, 'link' - reflinks or hardlinks where possible,
+# 'list' - no files are placed, output_dir/<split>.txt lists image paths (YOLO finds labels by replacing images/ with labels/)
+def stratify_and_split_dataset(image_dir, label_dir, output_dir, train_ratio=0.6, val_ratio=0.2, test_ratio=0.2,
+                               mode='copy', workers=8):
     # Get all image and label files
     image_files = [f for f in os.listdir(image_dir) if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
     label_files = [f for f in os.listdir(label_dir) if f.lower().endswith('.txt')]
@@ -94,36 +219,52 @@ def stratify_and_split_dataset(image_dir, label_dir, output_dir, train_ratio=0.6
         test_val_images, test_val_labels, test_size=(1 - val_ratio_adjusted), stratify=None, random_state=42
     )
 
-    # Create output directories
-    for split in ['train', 'val', 'test']:
-        os.makedirs(os.path.join(output_dir, split, 'images'), exist_ok=True)
-        os.makedirs(os.path.join(output_dir, split, 'labels'), exist_ok=True)
+    splits = [(train_images, train_labels, 'train'),
+              (val_images, val_labels, 'val'),
+              (test_images, test_labels, 'test')]
+    split_labels = {split: [os.path.join(label_dir, lbl) for lbl in labels] for _, labels, split in splits}
+
+    if mode == 'list':
+        # Split lists only, images stay in image_dir
+        os.makedirs(output_dir, exist_ok=True)
+        for images, _, split in splits:
+            with open(os.path.join(output_dir, f'{split}.txt'), 'w', encoding='utf-8') as f:
+                f.writelines(os.path.abspath(os.path.join(image_dir, img)) + '\n' for img in images)
+    else:
+        # Create output directories
+        for split in ['train', 'val', 'test']:
+            os.makedirs(os.path.join(output_dir, split, 'images'), exist_ok=True)
+            os.makedirs(os.path.join(output_dir, split, 'labels'), exist_ok=True)
 
-    # Copy files to respective directories
-    for images, labels, split in [(train_images, train_labels, 'train'),
-                                  (val_images, val_labels, 'val'),
-                                  (test_images, test_labels, 'test')]:
-        for img, lbl in zip(images, labels):
-            shutil.copy2(os.path.join(image_dir, img), os.path.join(output_dir, split, 'images', img))
-            shutil.copy2(os.path.join(label_dir, lbl), os.path.join(output_dir, split, 'labels', lbl))
+        # Place files to respective directories
+        pairs = []
+        for images, labels, split in splits:
+            for img, lbl in zip(images, labels):
+                pairs.append((os.path.join(image_dir, img), os.path.join(output_dir, split, 'images', img)))
+                pairs.append((os.path.join(label_dir, lbl), os.path.join(output_dir, split, 'labels', lbl)))
+        place_files(pairs, mode, workers)
 
     print(f"Dataset stratified and split successfully in {output_dir}")
     print(f"Train: {len(train_images)}, Validation: {len(val_images)}, Test: {len(test_images)}")
    
     # Plot class distribution
-    plot_combined_class_distribution(output_dir)
+    plot_combined_class_distribution(output_dir, split_labels)
 
 # выводим результат стратификации на экран
-def plot_combined_class_distribution(output_dir):
+# split_labels - label file paths of each split, by default read from output_dir/<split>/labels
+def plot_combined_class_distribution(output_dir, split_labels=None):
     splits = ['train', 'val', 'test']
     class_counts = {split: Counter() for split in splits}
 
     for split in splits:
-        label_dir = os.path.join(output_dir, split, 'labels')
-        label_files = [f for f in os.listdir(label_dir) if f.lower().endswith('.txt')]
+        if split_labels is not None:
+            label_files = split_labels[split]
+        else:
+            label_dir = os.path.join(output_dir, split, 'labels')
+            label_files = [os.path.join(label_dir, f) for f in os.listdir(label_dir) if f.lower().endswith('.txt')]
 
         for label_file in label_files:
-            with open(os.path.join(label_dir, label_file), 'r') as f:
+            with open(label_file, 'r') as f:
                 classes = [line.strip().split()[0] for line in f]
                 class_counts[split].update(classes)
 
@@ -156,7 +297,7 @@ def plot_combined_class_distribution(output_dir):
 # Usage example:
 source_directories = [rf'Для отчета\dataset_symbols_correct']
 target_directory = rf'Для отчета\dataset_symbols_correct_new\data_prepared'
-image_dir, label_dir = consolidate_files(source_directories, target_directory)
+image_dir, label_dir = consolidate_files(source_directories, target_directory, mode='link')
 print(get_class_labels(label_dir))
 class_mapping = {
      '0': '0',
@@ -193,4 +334,4 @@ print(get_class_labels(label_dir))
 
 # Usage example:
 output_directory = rf'Для отчета\dataset_symbols_correct_new\datasets'
-stratify_and_split_dataset(image_dir, label_dir, output_directory)
\ No newline at end of file
+stratify_and_split_dataset(image_dir, label_dir, output_directory, mode='list')
\ No newline at end of file